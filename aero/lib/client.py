@@ -0,0 +1,88 @@
+import os
+import sys
+import signal
+import socket
+
+# Thin client for 'aero --server' ('aero --client ...').
+# Kept to the standard library and free of other Aero imports so that it starts in
+# a few milliseconds. The client's stdin/stdout/stderr are passed to the server over
+# the Unix socket (SCM_RIGHTS), so the server writes straight to this terminal and
+# output streams with no copying; the socket itself only carries the request and
+# the exit status.
+#
+# A request is '<length>\n' followed by NUL-separated fields: cwd, the number of
+# arguments, the arguments, then the environment as NAME=VALUE (neither can
+# contain NUL). Plain strings keep 'json' (and 're') out of the client's imports.
+
+
+def encode_request(args, cwd, env):
+    fields = [cwd, str(len(args))] + list(args) + [f"{name}={value}" for name, value in env.items()]
+    payload = "\0".join(fields).encode("utf-8", "surrogateescape")
+    return str(len(payload)).encode() + b"\n" + payload
+
+def decode_request(payload):
+    """Returns {"cwd", "args", "env"} from a request payload (without the length line)."""
+    fields = payload.decode("utf-8", "surrogateescape").split("\0")
+    count = int(fields[1])
+    env = dict(field.split("=", 1) for field in fields[2 + count:] if "=" in field)
+    return {"cwd": fields[0], "args": fields[2:2 + count], "env": env}
+
+
+def _read_line(sock, buffer):
+    """Reads one newline-terminated message; returns (line, rest) or (None, b'') on EOF."""
+    while b"\n" not in buffer:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return None, b""
+        buffer += chunk
+    line, _, rest = buffer.partition(b"\n")
+    return line.decode(), rest
+
+def run(socket_path, args):
+    """
+    Runs one request ('-c CMD', a script path or '-' for stdin) on the server.
+
+    Returns:
+        int | None: The exit status, or None if no server is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    request = encode_request(args, os.getcwd(), os.environ)
+    with sock:
+        sent = socket.send_fds(sock, [request], [0, 1, 2])
+        if sent < len(request):
+            sock.sendall(request[sent:])
+
+        # The server replies with the pid of the process running the request, then its status
+        line, buffer = _read_line(sock, b"")
+        if line is None:
+            return 1
+        pgid = int(line.split()[1])
+
+        def forward(signum, frame):
+            # Ctrl-C etc. reach the request (and its external commands) as if run locally
+            try:
+                os.killpg(pgid, signum)
+            except OSError:
+                pass
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP, signal.SIGQUIT):
+            signal.signal(signum, forward)
+
+        line, buffer = _read_line(sock, buffer)
+        if line is None:
+            return 1
+        return int(line.split()[1])
+
+def main(socket_path, args):
+    """Entry point for 'aero --client'; falls back to running locally without a server."""
+    status = run(socket_path, args)
+    if status is None:
+        # No server: run the same arguments in this process instead
+        aero = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aero")
+        os.execv(sys.executable, [sys.executable, aero] + (args or ["-"]))
+    sys.exit(status)
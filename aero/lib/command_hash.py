@@ -0,0 +1,116 @@
+import os
+import time
+
+# Bash-style hash table for the external-command fallback: maps command names to
+# resolved executable paths so PATH is not searched on every invocation.
+# The table is dropped when $PATH changes, or when a PATH directory's mtime changes
+# (checked at most once every RECHECK_INTERVAL seconds).
+
+RECHECK_INTERVAL = 1.0
+
+# Command name -> absolute path of the executable
+COMMAND_HASH = {}
+# Number of lookups answered from the table, by command name (shown by 'hash')
+HITS = {}
+
+_path = None
+_dir_mtimes = {}
+_last_check = 0.0
+
+
+def _is_executable(path):
+    return os.path.isfile(path) and os.access(path, os.X_OK)
+
+def _path_dirs():
+    return [d for d in (_path or "").split(os.pathsep) if d]
+
+def _snapshot_dirs():
+    """Records the mtime of every PATH directory."""
+    mtimes = {}
+    for d in _path_dirs():
+        try:
+            mtimes[d] = os.stat(d).st_mtime_ns
+        except OSError:
+            mtimes[d] = None
+    return mtimes
+
+def clear():
+    """Empties the table (like 'hash -r')."""
+    COMMAND_HASH.clear()
+    HITS.clear()
+
+def _validate():
+    """Drops the table if PATH or the contents of a PATH directory changed."""
+    global _path, _dir_mtimes, _last_check
+    current_path = os.environ.get("PATH", os.defpath)
+    now = time.monotonic()
+    if current_path != _path:
+        _path = current_path
+        clear()
+        _dir_mtimes = _snapshot_dirs()
+        _last_check = now
+    elif now - _last_check >= RECHECK_INTERVAL:
+        mtimes = _snapshot_dirs()
+        if mtimes != _dir_mtimes:
+            clear()
+            _dir_mtimes = mtimes
+        _last_check = now
+
+def _search(name):
+    for d in _path_dirs():
+        candidate = os.path.join(d, name)
+        if _is_executable(candidate):
+            return candidate
+    return None
+
+def lookup(name, count_hit=True):
+    """
+    Returns the executable path for 'name', or None if it is not on PATH.
+
+    Names containing a '/' are not looked up on PATH (or hashed), as in a POSIX shell.
+    Pass count_hit=False to check for a command without counting it as run.
+    """
+    if os.sep in name:
+        return name if _is_executable(name) else None
+
+    _validate()
+    path = COMMAND_HASH.get(name)
+    if path is not None:
+        if count_hit:
+            HITS[name] = HITS.get(name, 0) + 1
+        return path
+
+    path = _search(name)
+    if path is not None:
+        COMMAND_HASH[name] = path
+        HITS[name] = 0
+    return path
+
+def forget(name):
+    """Removes one command from the table (e.g. after its executable disappeared)."""
+    COMMAND_HASH.pop(name, None)
+    HITS.pop(name, None)
+
+def prewarm():
+    """
+    Hashes every executable on PATH, keeping the first match for each name.
+
+    Returns:
+        int: The number of commands in the table afterwards.
+    """
+    _validate()
+    for d in _path_dirs():
+        try:
+            entries = list(os.scandir(d))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name in COMMAND_HASH:
+                continue
+            try:
+                if entry.is_file() and os.access(entry.path, os.X_OK):
+                    COMMAND_HASH[entry.name] = entry.path
+                    HITS[entry.name] = 0
+            except OSError:
+                continue
+    return len(COMMAND_HASH)
@@ -0,0 +1,241 @@
+import os
+import time
+import bisect
+import threading
+
+# Tab completion for the Aero prompt: command names (builtins, plugins and PATH
+# executables), declared subcommands and argument completers, and filesystem paths.
+#
+# Plugins declare their own completions from 'register_plugin_commands':
+#
+#   completion.register_completion("theme", subcommands=["list", "set"])
+#   completion.register_completion("theme set", completer=lambda text, args: theme_names())
+
+# Seconds a directory listing is reused without even stat()ing the directory
+LISTING_TTL = 2.0
+_LISTING_CACHE_MAX = 64
+
+# Command path (tuple of words) -> {"subcommands": [...], "completer": callable or None}
+COMPLETIONS = {}
+# Per-thread dict that also receives what register_completion() declares (see record_completions())
+_recording = threading.local()
+
+# Directory -> (checked_at, mtime_ns, sorted names with a trailing '/' on directories)
+_LISTINGS = {}
+
+_command_keys = None
+_command_tree = None
+_implicit_subcommands = {}
+_matches = []
+
+
+class PrefixTree:
+    """Character trie answering 'all words starting with prefix' queries."""
+
+    _END = ""  # Key marking the end of a word (never a real character)
+
+    def __init__(self, words=()):
+        self.root = {}
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self._END] = word
+
+    def with_prefix(self, prefix):
+        """Returns all words starting with 'prefix', sorted."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        words = []
+        stack = [node]
+        while stack:
+            for key, child in stack.pop().items():
+                if key == self._END:
+                    words.append(child)
+                else:
+                    stack.append(child)
+        return sorted(words)
+
+
+def register_completion(command, subcommands=(), completer=None):
+    """
+    Declares completions for a command or subcommand.
+
+    Args:
+        command (str): Command path, e.g. "theme" or "theme set".
+        subcommands (iterable): Words offered right after the command.
+        completer (callable): completer(text, args) returning candidates for an
+            argument, where 'args' are the words typed after the command path.
+    """
+    path = tuple(command.split())
+    spec = {
+        "subcommands": sorted(subcommands),
+        "completer": completer,
+    }
+    COMPLETIONS[path] = spec
+    into = getattr(_recording, "into", None)
+    if into is not None:
+        into[path] = spec
+
+def record_completions(into):
+    """
+    Makes register_completion() calls on this thread also store their spec in
+    'into' ({path: spec}), so the plugin manager knows which completions each
+    plugin declared. None stops recording.
+    """
+    _recording.into = into
+
+
+# --- Filesystem ---
+
+def _list_directory(directory):
+    """Returns the sorted entries of a directory, cached briefly and revalidated by mtime."""
+    now = time.monotonic()
+    cached = _LISTINGS.get(directory)
+    if cached and now - cached[0] < LISTING_TTL:
+        return cached[2]
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+    if cached and cached[1] == mtime_ns:
+        _LISTINGS[directory] = (now, mtime_ns, cached[2])
+        return cached[2]
+
+    names = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                names.append(entry.name + "/" if is_dir else entry.name)
+    except OSError:
+        return []
+    names.sort()
+
+    if len(_LISTINGS) >= _LISTING_CACHE_MAX:
+        _LISTINGS.clear()
+    _LISTINGS[directory] = (now, mtime_ns, names)
+    return names
+
+def _names_with_prefix(names, prefix):
+    """Yields names starting with 'prefix' from a sorted list (binary search, no full scan)."""
+    for name in names[bisect.bisect_left(names, prefix):]:
+        if not name.startswith(prefix):
+            break
+        yield name
+
+def complete_path(text, dirs_only=False):
+    """Completes a (possibly '~'-prefixed) filesystem path."""
+    if text == "~":
+        return ["~/"]
+    directory, prefix = os.path.split(os.path.expanduser(text))
+    head = text[:len(text) - len(prefix)]
+    matches = []
+    for name in _names_with_prefix(_list_directory(directory or "."), prefix):
+        # Hide dotfiles unless the user started typing one
+        if name.startswith(".") and not prefix.startswith("."):
+            continue
+        if dirs_only and not name.endswith("/"):
+            continue
+        matches.append(head + name)
+    return matches
+
+def complete_directory(text, args=()):
+    return complete_path(text, dirs_only=True)
+
+def complete_file(text, args=()):
+    return complete_path(text)
+
+
+# --- Commands ---
+
+def _refresh_commands(COMMANDS):
+    """Rebuilds the command prefix tree when the set of registered commands changes."""
+    global _command_keys, _command_tree, _implicit_subcommands
+    keys = frozenset(COMMANDS)
+    if keys == _command_keys:
+        return
+    _command_keys = keys
+    _command_tree = PrefixTree(name for name in keys if " " not in name)
+    # Multi-word commands (e.g. "ai setkey") imply subcommands of their first words
+    implicit = {}
+    for name in keys:
+        words = tuple(name.split())
+        for i in range(1, len(words)):
+            implicit.setdefault(words[:i], set()).add(words[i])
+    _implicit_subcommands = implicit
+
+def _executables_with_prefix(prefix):
+    names = set()
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        if directory:
+            names.update(n for n in _names_with_prefix(_list_directory(directory), prefix) if not n.endswith("/"))
+    return names
+
+def _spec_for(path):
+    spec = COMPLETIONS.get(path)
+    implicit = _implicit_subcommands.get(path)
+    if implicit:
+        spec = dict(spec or {"subcommands": [], "completer": None})
+        spec["subcommands"] = sorted(set(spec["subcommands"]) | implicit)
+    return spec
+
+def complete_line(COMMANDS, before, text):
+    """
+    Returns completion candidates for 'text', given the line up to where it starts.
+    """
+    _refresh_commands(COMMANDS)
+    words = before.split()
+    if not words:
+        if os.sep in text:
+            return complete_path(text)
+        return sorted(set(_command_tree.with_prefix(text)) | _executables_with_prefix(text))
+
+    # Use the longest declared command path matching the words typed so far
+    for length in range(len(words), 0, -1):
+        spec = _spec_for(tuple(words[:length]))
+        if spec:
+            break
+    else:
+        return complete_path(text)
+
+    candidates = []
+    if length == len(words):
+        candidates.extend(s for s in spec["subcommands"] if s.startswith(text))
+    completer = spec["completer"]
+    if completer is not None:
+        candidates.extend(c for c in completer(text, words[length:]) if c.startswith(text))
+    elif not candidates:
+        candidates = complete_path(text)
+    return candidates
+
+
+# --- Readline ---
+
+def install(readline_module, COMMANDS):
+    """Registers the Aero completer with readline and binds Tab to it."""
+    def complete(text, state):
+        if state == 0:
+            try:
+                line = readline_module.get_line_buffer()
+                _matches[:] = complete_line(COMMANDS, line[:readline_module.get_begidx()], text)
+            except Exception:
+                _matches[:] = []
+        return _matches[state] if state < len(_matches) else None
+
+    # Only whitespace and shell operators separate words, so paths complete as one word
+    readline_module.set_completer_delims(" \t\n;|&")
+    readline_module.set_completer(complete)
+    if "libedit" in (readline_module.__doc__ or ""):
+        readline_module.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline_module.parse_and_bind("tab: complete")
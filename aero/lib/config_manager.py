@@ -1,7 +1,18 @@
 import json
 import os
-import datetime
-import socket
+import atexit
+import sys
+import time
+# Locks for config writes and buffered output are created at import, so this is not lazy
+import threading
+
+# Only needed to render the {time_str} and {hostname} prompt placeholders
+from lazy_imports import lazy_import
+datetime = lazy_import("datetime")
+socket = lazy_import("socket")
+# Only needed to compile a prompt template
+string = lazy_import("string")
+_string = lazy_import("_string")
 
 # Attempt to import constants from the new location
 try:
@@ -35,57 +46,206 @@ DEFAULT_COLORS = {
 COLOR_MAP = DEFAULT_COLORS.copy()
 
 
-def load_config():
-    """Loads configuration from config.json into the global CONFIG and COLOR_MAP."""
-    global CONFIG, COLOR_MAP
-    
-    # Define a default configuration
-    default_config = {
+# Seconds save_config() waits before writing, so a burst of changes (a script
+# setting several keys) is written once
+CONFIG_WRITE_DELAY = 0.5
+
+# (st_mtime_ns, st_size) of config.json when it was last read or written
+_config_stat = None
+# Serialized config waiting to be written, and the timer that will write it
+_pending_config = None
+_config_timer = None
+_config_lock = threading.Lock()
+# Number of "error" messages printed by each thread (see errors_printed())
+_errors_printed = threading.local()
+
+
+def default_config():
+    """Returns a fresh copy of the settings used for keys missing from config.json."""
+    return {
         "color": True,
         "username": os.getenv("USER", "Aero-User"),
         "time_format": "%H:%M:%S",
         "active_theme": "default",
         "prompt_template": "<green>{username}</green>@<blue>{hostname}</blue> <yellow>{short_pwd}</yellow> ❯ ",
-        "colors": DEFAULT_COLORS
+        "colors": dict(DEFAULT_COLORS)
     }
 
+def _stat_config():
+    try:
+        st = os.stat(CONFIG_PATH)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def load_config(force=False):
+    """
+    Loads configuration from config.json into the global CONFIG and COLOR_MAP.
+
+    The file is only parsed again if its mtime or size changed since it was
+    last read or written (or with 'force'). Pending writes are flushed first,
+    so the file is never older than CONFIG.
+
+    Returns:
+        set: The keys whose values changed (empty if the file was not re-read).
+    """
+    global CONFIG, _config_stat
+    flush_config()
+    current_stat = _stat_config()
+    if not force and CONFIG and current_stat is not None and current_stat == _config_stat:
+        return set()
+    old_config = CONFIG
+    
+    # Define a default configuration
+    new_config = default_config()
+
     try:
         with open(CONFIG_PATH, 'r') as f:
             loaded_config = json.load(f)
             # Merge loaded config with defaults (in case new keys were added)
-            CONFIG = default_config
+            CONFIG = new_config
             CONFIG.update(loaded_config)
+        _config_stat = current_stat
             
     except FileNotFoundError:
         print(f"\033[33mWarning: {CONFIG_PATH} not found. Creating with default settings.\033[0m")
-        CONFIG = default_config
-        save_config(CONFIG)
+        CONFIG = new_config
+        save_config(CONFIG, immediate=True)
     except json.JSONDecodeError:
         print(f"\033[31mError: {CONFIG_PATH} contains invalid JSON. Using default settings.\033[0m")
-        CONFIG = default_config
-        save_config(CONFIG)
+        CONFIG = new_config
+        save_config(CONFIG, immediate=True)
     except Exception as e:
         print(f"\033[31mError loading config: {e}. Using default settings.\033[0m")
-        CONFIG = default_config
+        CONFIG = new_config
         
-    # Update the global COLOR_MAP from the loaded configuration
-    COLOR_MAP = CONFIG.get("colors", DEFAULT_COLORS).copy()
+    return _apply_config(old_config)
+
+def reload_config():
+    """
+    Picks up changes made to config.json by another session or tool.
+
+    Cheap enough to run before every prompt: one stat() call unless the file's
+    mtime or size changed. Unlike load_config(), a file that can't be read or
+    parsed (e.g. caught mid-edit) leaves the current settings in place.
+
+    Returns:
+        set: The keys whose values changed.
+    """
+    global CONFIG, _config_stat
+    if _pending_config is not None:
+        return set() # Our own change is about to be written and wins
+    current_stat = _stat_config()
+    if current_stat is None or current_stat == _config_stat:
+        return set()
+    _config_stat = current_stat
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            loaded_config = json.load(f)
+        if not isinstance(loaded_config, dict):
+            raise ValueError("expected a JSON object")
+    except (OSError, ValueError) as e:
+        print_colored(f"Warning: {CONFIG_PATH} changed but could not be loaded ({e}). Keeping current settings.", "warning")
+        return set()
+
+    old_config = CONFIG
+    CONFIG = default_config()
+    CONFIG.update(loaded_config)
+    return _apply_config(old_config)
+
+def _apply_config(old_config):
+    """
+    Re-applies what differs between 'old_config' and CONFIG and returns the changed keys.
+
+    Only color changes rebuild COLOR_MAP and the color table, and only a new
+    prompt_template is compiled; everything else (username, time_format, ...)
+    is read from CONFIG when used.
+    """
+    global COLOR_MAP
+    changed = {key for key in CONFIG.keys() | old_config.keys() if CONFIG.get(key) != old_config.get(key)}
+    if not old_config or changed & {"color", "colors"}:
+        COLOR_MAP = CONFIG.get("colors", DEFAULT_COLORS).copy()
+        rebuild_color_table() # Also drops compiled prompts, whose tags hold the old codes
+    elif "prompt_template" in changed:
+        invalidate_prompt_cache()
+    if old_config and "prompt_template" in changed and isinstance(CONFIG.get("prompt_template"), str):
+        try:
+            compile_prompt(CONFIG["prompt_template"])
+        except ValueError:
+            pass # Reported when the prompt is rendered
+    return changed
 
 
-def save_config(new_config=None):
-    """Saves the current global configuration back to config.json."""
-    global CONFIG
+def save_config(new_config=None, immediate=False):
+    """
+    Saves the current global configuration back to config.json.
+
+    Changes take effect in memory at once; the file is written CONFIG_WRITE_DELAY
+    seconds later (one write for a burst of saves), at exit, or right away with
+    'immediate'. The write goes to a temporary file that replaces config.json,
+    so readers never see a partially written file.
+
+    Returns:
+        bool: False if the config could not be serialized or written.
+    """
+    global CONFIG, COLOR_MAP, _pending_config, _config_timer
     if new_config:
         CONFIG = new_config
-        
+
+    # The template or colors may have been edited in place; recompile on next render
+    COLOR_MAP = CONFIG.get("colors", DEFAULT_COLORS).copy()
+    rebuild_color_table()
+
     try:
-        with open(CONFIG_PATH, 'w') as f:
-            # Ensure colors are written as plain strings (not string literals)
-            json.dump(CONFIG, f, indent=2)
+        # Serialized now, so later in-place edits can't race with the write
+        text = json.dumps(CONFIG, indent=2)
+    except (TypeError, ValueError) as e:
+        print_colored(f"Error saving config: {e}", "error")
+        return False
+
+    with _config_lock:
+        _pending_config = text
+        if immediate:
+            return _write_pending_config()
+        if _config_timer is None:
+            _config_timer = threading.Timer(CONFIG_WRITE_DELAY, flush_config)
+            _config_timer.daemon = True
+            _config_timer.start()
+    return True
+
+def _write_pending_config():
+    """Writes _pending_config atomically (temp file + rename); call with _config_lock held."""
+    global _pending_config, _config_timer, _config_stat
+    if _config_timer is not None:
+        _config_timer.cancel()
+        _config_timer = None
+    if _pending_config is None:
         return True
-    except Exception as e:
+    text, _pending_config = _pending_config, None
+
+    temp_path = f"{CONFIG_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, CONFIG_PATH)
+    except OSError as e:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
         print_colored(f"Error saving config: {e}", "error")
         return False
+    _config_stat = _stat_config()
+    return True
+
+def flush_config():
+    """Writes a pending config change now (at exit, before reloading, ...)."""
+    if _pending_config is None:
+        return True
+    with _config_lock:
+        return _write_pending_config()
 
 def get_config(key=None):
     """Returns the entire config dictionary or a specific key's value."""
@@ -95,52 +255,362 @@ def get_config(key=None):
 
 # --- Utility Functions ---
 
+# Color key -> (prefix, suffix), compiled from COLOR_MAP by rebuild_color_table().
+# Empty when color output is off, which makes colorize() a plain passthrough.
+COLOR_TABLE = {}
+# Threads whose output is captured for a pipeline and must stay plain
+_PLAIN_THREADS = set()
+
+
+def colors_wanted(stream=None):
+    """
+    Decides whether ANSI colors should be written to 'stream' (default sys.stdout).
+
+    'color' set to "always" forces colors; otherwise they are only used on a
+    terminal, and never with NO_COLOR set (https://no-color.org) or TERM=dumb.
+    """
+    setting = CONFIG.get("color", True)
+    if setting == "always":
+        return True
+    if not setting or os.environ.get("NO_COLOR") or os.environ.get("TERM") == "dumb":
+        return False
+    try:
+        return (stream or sys.stdout).isatty()
+    except (AttributeError, ValueError):
+        return False # Detached or closed stream
+
+def rebuild_color_table():
+    """
+    Compiles COLOR_MAP into COLOR_TABLE and drops compiled prompts.
+
+    Called whenever the config or theme changes, and when the output stream
+    changes (e.g. a server request adopting a client's terminal).
+    """
+    global COLOR_TABLE
+    table = {}
+    if colors_wanted():
+        reset_code = COLOR_MAP.get("reset", DEFAULT_COLORS["reset"])
+        table = {key: (code, reset_code) for key, code in COLOR_MAP.items()}
+        table["reset"] = (reset_code, reset_code)
+    COLOR_TABLE = table
+    invalidate_prompt_cache()
+
+def set_plain_output(plain):
+    """Turns colors off (or back on) for output produced by the calling thread."""
+    if plain:
+        _PLAIN_THREADS.add(threading.get_ident())
+    else:
+        _PLAIN_THREADS.discard(threading.get_ident())
+
 def colorize(text, color_key):
     """Applies ANSI color codes to text based on the color map."""
-    if not CONFIG.get("color", True):
+    table = COLOR_TABLE
+    if not table or (_PLAIN_THREADS and threading.get_ident() in _PLAIN_THREADS):
         return text
-    
-    color_code = COLOR_MAP.get(color_key, COLOR_MAP["reset"])
-    reset_code = COLOR_MAP["reset"]
-    return f"{color_code}{text}{reset_code}"
+    prefix, suffix = table.get(color_key) or table["reset"]
+    return prefix + text + suffix
+
+def get_color(color_key):
+    """Returns the ANSI code for a color key ('' when color output is off)."""
+    table = COLOR_TABLE
+    if not table or (_PLAIN_THREADS and threading.get_ident() in _PLAIN_THREADS):
+        return ""
+    return (table.get(color_key) or table["reset"])[0]
+
+# Color keys by category, for 'config colors' and 'config color <type> <color>'
+COLOR_CATEGORIES = {
+    "interface": ["success", "warning", "error", "info", "header", "subheader", "dim"],
+    "data": ["data_primary", "data_secondary", "data_value", "data_key"],
+    "prompt": ["prompt_text"],
+}
+
+def get_color_palette():
+    """Returns {category: [color keys]}, with keys added by themes under 'other'."""
+    palette = {category: list(keys) for category, keys in COLOR_CATEGORIES.items()}
+    known = {key for keys in COLOR_CATEGORIES.values() for key in keys}
+    other = sorted(key for key in COLOR_MAP if key not in known and key != "reset")
+    if other:
+        palette["other"] = other
+    return palette
 
 def print_colored(text, color_key="info"):
     """Prints text with the specified color."""
-    print(colorize(text, color_key))
+    if color_key == "error":
+        _errors_printed.count = getattr(_errors_printed, "count", 0) + 1
+    # One write per line (print() would make two)
+    sys.stdout.write(f"{colorize(text, color_key)}\n")
+
+def errors_printed():
+    """
+    Returns how many "error" messages the calling thread has printed, so a caller
+    can tell whether a command that returned no status reported a failure.
+    """
+    return getattr(_errors_printed, "count", 0)
+
+# --- Output Buffering ---
+
+# Buffered output is passed on once it reaches this many characters...
+OUTPUT_FLUSH_THRESHOLD = 64 * 1024
+# ...or at the latest this many seconds after the first buffered write
+OUTPUT_FLUSH_DELAY = 0.05
+
+class BufferedWriter:
+    """
+    sys.stdout stand-in that collects everything printed (print_colored(), plain
+    print() in plugins, ...) and writes it to the terminal in large blocks instead
+    of one write per line.
+
+    The buffer is flushed at command boundaries, before external commands and
+    input() (which flushes stdout itself), once it exceeds OUTPUT_FLUSH_THRESHOLD,
+    and shortly after the first buffered write, so progress messages from a slow
+    command still appear promptly.
+
+    A write error on the timer thread (EPIPE, EIO) drops the text that could not
+    be written and is raised by the next write() or flush() on the main thread.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._parts = []
+        self._size = 0
+        self._timer = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def _raise_timer_error(self):
+        if self._error is not None and threading.current_thread() is threading.main_thread():
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, text):
+        with self._lock:
+            self._raise_timer_error()
+            self._parts.append(text)
+            self._size += len(text)
+            if self._size >= OUTPUT_FLUSH_THRESHOLD:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(OUTPUT_FLUSH_DELAY, self._timer_flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return len(text)
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self.stream.write(text)
+        self.stream.flush()
+
+    def flush(self):
+        with self._lock:
+            self._raise_timer_error()
+            self._flush_locked()
+
+    def _timer_flush(self):
+        with self._lock:
+            try:
+                self._flush_locked()
+            except OSError as e:
+                # Nobody to report to on this thread; the text is lost either way
+                self._parts.clear()
+                self._size = 0
+                self._error = e
+
+    def __getattr__(self, attr):
+        # fileno(), isatty(), encoding, buffer, ... come from the real stream
+        return getattr(self.stream, attr)
+
+def install_output_buffer():
+    """Routes sys.stdout through a BufferedWriter (once)."""
+    if not isinstance(sys.stdout, BufferedWriter):
+        sys.stdout = BufferedWriter(sys.stdout)
+
+def flush_output():
+    """Writes out any buffered output (e.g. before running an external command)."""
+    sys.stdout.flush()
+
+# --- Prompt Rendering ---
+
+class PromptProvider:
+    """
+    Computes the value of one prompt placeholder.
+
+    Values are cached for 'ttl' seconds (0 means recompute on every render).
+    Background providers never block rendering: the last cached value (or
+    'default' before the first result) is returned immediately and a stale
+    value is refreshed on a daemon thread, to be picked up by the next prompt.
+    """
+
+    def __init__(self, func, ttl=0.0, background=False, default=""):
+        self.func = func
+        self.ttl = ttl
+        self.background = background
+        self.value = default
+        self.updated = None
+        self.refreshing = False
+
+    def is_stale(self):
+        return self.updated is None or time.monotonic() - self.updated >= self.ttl
+
+    def get(self):
+        """Returns the placeholder value, computing or scheduling a refresh if stale."""
+        if not self.is_stale():
+            return self.value
+        if self.background:
+            self.refresh_async()
+        else:
+            self.value = self.func()
+            self.updated = time.monotonic()
+        return self.value
+
+    def refresh_async(self):
+        """Starts a background refresh unless one is already running."""
+        if self.refreshing:
+            return
+        self.refreshing = True
+        threading.Thread(target=self._refresh, name="aero-prompt-provider", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            self.value = self.func()
+        except Exception:
+            pass # Keep showing the last good value
+        finally:
+            self.updated = time.monotonic()
+            self.refreshing = False
+
+
+# Values available to prompt templates. Each one is only evaluated when the
+# template being rendered actually references it.
+PROMPT_PLACEHOLDERS = {}
+# Per-thread dict that also receives what register_prompt_provider() registers (see record_prompt_providers())
+_recording = threading.local()
+
+def record_prompt_providers(into):
+    """
+    Makes register_prompt_provider() calls on this thread also store their
+    provider in 'into' ({name: PromptProvider}), so the plugin manager knows
+    which placeholders each plugin registered. None stops recording.
+    """
+    _recording.into = into
+
+def register_prompt_provider(name, func, ttl=0.0, background=False, default=""):
+    """
+    Registers (or replaces) the provider for the '{name}' prompt placeholder.
+
+    Plugins can call this from their 'register_plugin_commands' function.
+
+    Args:
+        name (str): Placeholder name as used in prompt_template.
+        func (callable): Takes no arguments and returns the placeholder value.
+        ttl (float): Seconds a computed value stays fresh (0 = every render).
+        background (bool): Compute on a background thread instead of blocking the prompt.
+        default: Value shown until a background provider has produced its first result.
+    """
+    provider = PromptProvider(func, ttl, background, default)
+    PROMPT_PLACEHOLDERS[name] = provider
+    into = getattr(_recording, "into", None)
+    if into is not None:
+        into[name] = provider
+
+register_prompt_provider("username", lambda: CONFIG.get("username", "user"))
+register_prompt_provider("time_str", lambda: datetime.datetime.now().strftime(CONFIG.get("time_format", "%H:%M:%S")))
+register_prompt_provider("hostname", lambda: socket.gethostname().split('.')[0], ttl=60)
+register_prompt_provider("full_pwd", lambda: os.getcwd())
+# Get the last component of the path for 'short_pwd'
+register_prompt_provider("short_pwd", lambda: os.path.basename(os.getcwd()) or "/")
+
+# Compiled templates: template string -> list of segments (see _parse_template())
+_PROMPT_CACHE = {}
+_PROMPT_CACHE_MAX = 32
+
+
+def invalidate_prompt_cache():
+    """Drops all compiled prompt templates (called whenever the template or colors change)."""
+    _PROMPT_CACHE.clear()
+
+def compile_prompt(template):
+    """
+    Compiles a prompt template into a segment list.
+
+    Color tags (<color>...</color>) are resolved to ANSI codes once, and the
+    '{placeholder}' fields are split out so rendering only has to evaluate the
+    placeholders the template uses.
+    """
+    compiled = _PROMPT_CACHE.get(template)
+    if compiled is not None:
+        return compiled
 
-def format_prompt(template):
-    """Formats the prompt template with dynamic values and color tags."""
-    
-    # 1. Prepare dynamic values
-    username = CONFIG.get("username", "user")
-    time_str = datetime.datetime.now().strftime(CONFIG.get("time_format", "%H:%M:%S"))
-    hostname = socket.gethostname().split('.')[0]
-    full_pwd = os.getcwd()
-    # Get the last component of the path for 'short_pwd'
-    short_pwd = os.path.basename(full_pwd) or "/" 
-
-    # 2. Prepare color replacement map
-    # This uses a simple regex-like replacement for tags like <color>text</color>
-    
     colored_template = template
-    
-    # Replace <color> tags with ANSI codes
-    for color_name, color_code in COLOR_MAP.items():
+    # Replace <color> tags with ANSI codes (or nothing when color output is off)
+    for color_name in COLOR_MAP:
+        prefix, suffix = COLOR_TABLE.get(color_name, ("", ""))
         # Open tag replacement: <color> -> ANSI code
-        colored_template = colored_template.replace(f"<{color_name}>", color_code)
+        colored_template = colored_template.replace(f"<{color_name}>", prefix)
         # Close tag replacement: </color> -> RESET code
-        colored_template = colored_template.replace(f"</{color_name}>", COLOR_MAP["reset"])
-
-    # 3. Apply dynamic values
-    formatted_prompt = colored_template.format(
-        username=username,
-        time_str=time_str,
-        hostname=hostname,
-        full_pwd=full_pwd,
-        short_pwd=short_pwd
-    )
-
-    return formatted_prompt
+        colored_template = colored_template.replace(f"</{color_name}>", suffix)
+
+    compiled = _parse_template(colored_template)
+
+    if len(_PROMPT_CACHE) >= _PROMPT_CACHE_MAX:
+        _PROMPT_CACHE.clear()
+    _PROMPT_CACHE[template] = compiled
+    return compiled
+
+def _parse_template(text):
+    """
+    Splits a template into (literal, name, accessors, format_spec, conversion)
+    segments, as str.format would read it. 'name' is None for trailing text,
+    'accessors' are the (is_attribute, key) steps of '{name.attr[key]}', and a
+    format spec with nested fields ('{username:>{width}}') is itself parsed.
+    """
+    segments = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(text):
+        if field is None:
+            segments.append((literal, None, (), "", None))
+            continue
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"Unknown conversion specifier {conversion}")
+        name, accessors = _string.formatter_field_name_split(field)
+        if "{" in format_spec:
+            format_spec = _parse_template(format_spec)
+        segments.append((literal, name, tuple(accessors), format_spec, conversion))
+    return segments
+
+def _render(segments, values):
+    """Renders parsed segments, evaluating each placeholder once into 'values'."""
+    parts = []
+    for literal, name, accessors, format_spec, conversion in segments:
+        parts.append(literal)
+        if name is None:
+            continue
+        if name not in values:
+            # Unknown placeholders raise KeyError, just like str.format would
+            values[name] = PROMPT_PLACEHOLDERS[name].get()
+        value = values[name]
+        for is_attribute, key in accessors:
+            value = getattr(value, key) if is_attribute else value[key]
+        if conversion == "r":
+            value = repr(value)
+        elif conversion == "a":
+            value = ascii(value)
+        elif conversion == "s":
+            value = str(value)
+        if not isinstance(format_spec, str):
+            format_spec = _render(format_spec, values)
+        parts.append(format(value, format_spec))
+    return "".join(parts)
+
+def format_prompt(template):
+    """Formats the prompt template with dynamic values and color tags."""
+    return _render(compile_prompt(template), {})
     
 # Initialize config on module load
 load_config()
+# Changes still waiting for CONFIG_WRITE_DELAY are written when Aero exits
+atexit.register(flush_config)
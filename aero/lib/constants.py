@@ -11,6 +11,18 @@ PLUGINS_DIR = os.path.join(AERO_DIR, "plugins")
 CONFIG_PATH = os.path.join(AERO_DIR, "config.json")
 COMMANDS_FILE = os.path.join(LIB_DIR, "core_commands.py")
 
+# Cache of the commands each plugin registers, so plugins can be imported lazily
+PLUGIN_MANIFEST_PATH = os.path.join(AERO_DIR, ".plugin_manifest.json")
+
+# Command history shared by all sessions (SQLite)
+HISTORY_DB_PATH = os.path.join(AERO_DIR, ".aero_history.db")
+
+# Cached responses of repository catalog requests (see http_cache.py)
+HTTP_CACHE_DIR = os.path.join(AERO_DIR, ".http_cache")
+
+# Unix socket of 'aero --server' ($AERO_SOCKET overrides it, e.g. for paths over ~100 characters)
+SERVER_SOCKET_PATH = os.environ.get("AERO_SOCKET") or os.path.join(AERO_DIR, ".aero.sock")
+
 # --- Repository URL Constants ---
 REPO_ROOT_URL = "https://raw.githubusercontent.com/nebuff/aero/main"
 REPO_PLUGINS_URL = f"{REPO_ROOT_URL}/plugins"
@@ -1,10 +1,9 @@
 import os
-import json
 import sys
-try:
-    import psutil
-except ImportError:
-    psutil = None
+
+# json is only needed on first run and psutil only for the {battery} placeholder
+from lazy_imports import lazy_import, try_import
+json = lazy_import("json")
 
 # Import constants from our new constants file
 from constants import PLUGINS_DIR, LIB_DIR, CONFIG_PATH, DEFAULT_CONFIG
@@ -36,6 +35,10 @@ def initialize_aero():
     if not os.path.exists(gitignore_path):
         gitignore_content = """# Aero files
 .aero_history
+.aero_history.db*
+.aero.sock
+.http_cache/
+.plugin_manifest.json
 config.json
 
 # Python cache
@@ -53,6 +56,7 @@ plugins/__pycache__/
 
 def get_battery_percent():
     """Get battery percentage for laptops"""
+    psutil = try_import("psutil")
     if not psutil:
         return "N/A" # psutil not installed
     try:
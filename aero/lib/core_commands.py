@@ -1,11 +1,16 @@
 import os
 import sys
-import shlex
-import urllib.request
-import json
-import datetime
-import subprocess
-import ssl
+import time
+import signal
+import itertools
+
+# Network and date modules are only needed by a few commands ('time', 'pl', 'install', ...)
+from lazy_imports import lazy_import
+json = lazy_import("json")
+datetime = lazy_import("datetime")
+collections = lazy_import("collections")
+http_client = lazy_import("http_client")
+http_cache = lazy_import("http_cache")
 
 # Import constants
 from constants import (
@@ -19,27 +24,37 @@ from constants import (
 # Import other library modules
 import config_manager as cm
 import plugin_manager as pm
+import command_hash
+import history
+import completion
+import jobs
+import file_reader
+import listing
 import core
 
 # --- Helper Functions ---
 
 def _get_installed_plugins():
-    """Helper to get a list of installed plugin names."""
-    if not os.path.isdir(PLUGINS_DIR):
-        return []
-    return sorted([f[:-3] for f in os.listdir(PLUGINS_DIR) if f.endswith(".py")])
+    """Helper to get a list of installed plugin names (from the plugin registry)."""
+    return list(pm.plugin_registry())
+
+def _plugin_label(name, info):
+    """Formats a plugin name with its version, and its state unless it loaded fine."""
+    label = cm.colorize(name, 'data_primary')
+    if info.get("version"):
+        label += f" {cm.colorize(info['version'], 'data_value')}"
+    if info["state"] == "failed":
+        label += f" {cm.colorize('(failed: ' + info['error'] + ')', 'error')}"
+    elif info["state"] != "loaded":
+        label += f" {cm.colorize('(' + info['state'] + ')', 'dim')}"
+    return label
 
 def _get_available_plugins():
     """Helper to fetch available plugin names from the GitHub repo."""
     try:
         api_url = "https://api.github.com/repos/nebuff/aero/contents/plugins"
-        # Create an unverified SSL context for simplicity (not ideal for production)
-        context = ssl._create_unverified_context()
-        
-        with urllib.request.urlopen(api_url, context=context, timeout=5) as resp:
-            data = resp.read().decode()
-            
-        files = json.loads(data)
+        # Cached on disk and revalidated with ETags (see http_cache.py)
+        files = http_cache.fetch_json(api_url)
         available = set()
         for f in files:
             name = f.get("name", "")
@@ -52,14 +67,91 @@ def _get_available_plugins():
 
 # --- Core Commands ---
 
+# Builtins with a 'stream' attribute act as generators inside '|' pipelines
+# (see pipeline.py): stream(args, lines) yields plain output lines, consuming
+# the previous stage's lines if the command reads input.
+
+def _ls_options(args):
+    """Parses 'ls' arguments into (paths, flags); raises ValueError for unknown flags."""
+    paths = []
+    flags = set()
+    for arg in args:
+        if arg.startswith("-") and len(arg) > 1:
+            unknown = sorted(set(arg[1:]) - set("laSt1"))
+            if unknown:
+                raise ValueError(f"invalid option -- '{unknown[0]}'")
+            flags.update(arg[1:])
+        else:
+            paths.append(arg)
+    return paths or ["."], flags
+
+def _ls_lines(args, colorize, width):
+    """
+    Builds the 'ls' output lines for all paths (width None means one name per line).
+
+    Returns:
+        tuple: (lines, errors)
+    """
+    paths, flags = _ls_options(args)
+    sort_by = "size" if "S" in flags else "time" if "t" in flags else "name"
+
+    def render(entries):
+        listing.sort_entries(entries, sort_by)
+        if "l" in flags:
+            return listing.long_lines(entries, colorize)
+        if width is None or "1" in flags:
+            return [colorize(entry.name, listing.TYPE_COLORS[listing.entry_type(entry)]) for entry in entries]
+        return listing.column_lines(entries, colorize, width)
+
+    errors = []
+    files = []
+    directories = []
+    for path in paths:
+        try:
+            entry = listing.PathEntry(path)
+            (directories if entry.is_dir() else files).append(entry)
+        except OSError as e:
+            errors.append(f"ls: {path}: {e.strerror}")
+
+    lines = render(files)
+    for entry in directories:
+        try:
+            entries = listing.scan(entry.path, show_all="a" in flags)
+        except OSError as e:
+            errors.append(f"ls: {entry.path}: {e.strerror}")
+            continue
+        if len(paths) > 1:
+            if lines:
+                lines.append("")
+            lines.append(f"{entry.path}:")
+        lines.extend(render(entries))
+    return lines, errors
+
+def stream_ls(args, lines):
+    """Yields plain 'ls' output lines (one name per line unless '-l')."""
+    output, errors = _ls_lines(args, lambda text, color_key: text, None)
+    for error in errors:
+        print(error, file=sys.stderr)
+    yield from output
+
 def cmd_ls(args):
-    """Lists files in the current or specified directory."""
-    path = args[0] if args else '.'
+    """Lists files in the current or specified directories."""
     try:
-        for entry in os.listdir(path):
-            cm.print_colored(entry, "data_primary")
-    except Exception as e:
+        width = os.get_terminal_size(sys.stdout.fileno()).columns if sys.stdout.isatty() else None
+        lines, errors = _ls_lines(args, cm.colorize, width)
+    except ValueError as e:
         cm.print_colored(f"ls: {e}", "error")
+        cm.print_colored("Usage: ls [-l] [-a] [-S | -t] [-1] [path ...]", "info")
+        return 1
+    for error in errors:
+        cm.print_colored(error, "error")
+    # One write for the whole listing
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    return 1 if errors else 0
+
+cmd_ls.stream = stream_ls
 
 def cmd_cd(args):
     """Changes the current working directory."""
@@ -69,21 +161,26 @@ def cmd_cd(args):
             os.chdir(os.path.expanduser("~"))
         except Exception as e:
             cm.print_colored(f"cd: {e}", "error")
-        return
+            return 1
+        return 0
     try:
         os.chdir(args[0])
     except Exception as e:
         cm.print_colored(f"cd: {e}", "error")
+        return 1
+    return 0
 
 def cmd_mkdir(args):
     """Creates a new directory."""
     if not args:
         cm.print_colored("mkdir: missing operand", "error")
-        return
+        return 1
     try:
         os.makedirs(args[0], exist_ok=True)
     except Exception as e:
         cm.print_colored(f"mkdir: {e}", "error")
+        return 1
+    return 0
 
 def cmd_exit(args):
     """Exits the shell (handled by main loop, but good to have registered)."""
@@ -94,11 +191,11 @@ def cmd_exit(args):
 
 def installist(args):
     """Lists installed and available plugins."""
-    installed = _get_installed_plugins()
+    installed = pm.plugin_registry()
     if installed:
         cm.print_colored("Installed plugins:", "subheader")
-        for plugin in installed:
-            print(f"  - {cm.colorize(plugin, 'data_primary')}")
+        for plugin, info in installed.items():
+            print(f"  - {_plugin_label(plugin, info)}")
     else:
         cm.print_colored("No plugins installed.", "warning")
 
@@ -110,13 +207,22 @@ def installist(args):
             print(f"  {mark} {cm.colorize(plugin, 'data_primary')}")
     else:
         cm.print_colored("Could not retrieve list of available plugins.", "error")
+        return 1
+    return 0
+
+def _valid_plugin_name(plugin_name):
+    """A plugin name must be a bare file name, so it can't point outside PLUGINS_DIR."""
+    return plugin_name not in ("", ".", "..") and os.path.basename(plugin_name) == plugin_name
 
 def install_plugin(args):
     """Downloads and installs a plugin from the repo."""
     if not args:
         cm.print_colored("install: missing plugin name", "error")
-        return
+        return 1
     plugin_name = args[0].replace(".py", "")
+    if not _valid_plugin_name(plugin_name):
+        cm.print_colored(f"install: invalid plugin name '{args[0]}'", "error")
+        return 1
     plugin_file = f"{plugin_name}.py"
     url = f"{REPO_PLUGINS_URL}/{plugin_file}"
     dest = os.path.join(PLUGINS_DIR, plugin_file)
@@ -124,58 +230,169 @@ def install_plugin(args):
     os.makedirs(PLUGINS_DIR, exist_ok=True)
     
     try:
-        context = ssl._create_unverified_context()
         cm.print_colored(f"Downloading plugin from {url} ...", "info")
-        with urllib.request.urlopen(url, context=context) as response, open(dest, "wb") as out_file:
-            out_file.write(response.read())
-        cm.print_colored(f"Installed plugin '{plugin_name}'. Restart Aero to load it.", "success")
+        http_client.download(url, dest)
     except Exception as e:
         cm.print_colored(f"Failed to install plugin: {e}", "error")
+        return 1
+    # Load it now, which also records it in the plugin registry
+    result = pm.reload_plugins(_COMMANDS)
+    if plugin_name in result["failed"]:
+        cm.print_colored(f"Installed plugin '{plugin_name}', but it failed to load.", "warning")
+        return 1
+    cm.print_colored(f"Installed plugin '{plugin_name}'.", "success")
+    return 0
 
 def installdelete(args):
     """Deletes an installed plugin."""
     if not args:
         cm.print_colored("installdelete: missing plugin name", "error")
-        return
+        return 1
     plugin_name = args[0].replace(".py", "")
+    if not _valid_plugin_name(plugin_name):
+        cm.print_colored(f"installdelete: invalid plugin name '{args[0]}'", "error")
+        return 1
     plugin_file = f"{plugin_name}.py"
     plugin_path = os.path.join(PLUGINS_DIR, plugin_file)
     
     if os.path.isfile(plugin_path):
         try:
             os.remove(plugin_path)
-            cm.print_colored(f"Deleted plugin '{plugin_name}'. Restart Aero to unload it.", "success")
         except Exception as e:
             cm.print_colored(f"Failed to delete plugin: {e}", "error")
-    else:
-        cm.print_colored(f"Plugin '{plugin_name}' is not installed.", "error")
+            return 1
+        # Unregister its commands and drop it from the plugin registry
+        pm.reload_plugins(_COMMANDS)
+        cm.print_colored(f"Deleted plugin '{plugin_name}'.", "success")
+        return 0
+    cm.print_colored(f"Plugin '{plugin_name}' is not installed.", "error")
+    return 1
 
 def cmd_pwd(args):
     """Prints the current working directory."""
     cm.print_colored(os.getcwd(), "data_value")
 
+def _sfc_options(args):
+    """Parses 'sfc' arguments into (path, options); raises ValueError on bad usage."""
+    options = {"head": None, "tail": None, "bytes": None, "follow": False}
+    path = None
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        name, has_value, value = arg.partition("=")
+        if name in ("--head", "--tail", "--bytes"):
+            if not has_value:
+                if not args:
+                    raise ValueError(f"option '{name}' requires an argument")
+                value = args.pop(0)
+            key = name[2:]
+            options[key] = value if key == "bytes" else int(value)
+        elif arg in ("--follow", "-f"):
+            options["follow"] = True
+        elif path is None:
+            path = arg
+        else:
+            raise ValueError(f"unexpected argument '{arg}'")
+    if sum(options[key] is not None for key in ("head", "tail", "bytes")) > 1:
+        raise ValueError("use only one of --head, --tail and --bytes")
+    if options["follow"] and (options["head"] is not None or options["bytes"] is not None):
+        raise ValueError("--follow can only be combined with --tail")
+    return path, options
+
+def _sfc_chunks(f, size, path, options):
+    """Returns (byte chunks to show, offset of the first one) for the selected part of a file."""
+    if options["bytes"] is not None:
+        start, end = file_reader.parse_range(options["bytes"], size)
+        return file_reader.read_range(f, start, end), start
+    if options["head"] is not None:
+        return file_reader.read_head(f, options["head"]), 0
+
+    tail = options["tail"]
+    if tail is None and options["follow"]:
+        tail = file_reader.DEFAULT_FOLLOW_LINES
+    start = file_reader.tail_offset(f, size, tail) if tail is not None else 0
+    chunks = file_reader.read_range(f, start, size)
+    if options["follow"]:
+        chunks = itertools.chain(chunks, file_reader.follow(f, path))
+    return chunks, start
+
+def _sfc_binary(f, size, path, options):
+    """Shows a binary file: raw bytes when redirected, otherwise a hex dump of a '--bytes' range."""
+    if not sys.stdout.isatty():
+        chunks, _ = _sfc_chunks(f, size, path, options)
+        sys.stdout.flush()
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return 0
+    if options["bytes"] is None:
+        cm.print_colored(f"sfc: {path}: binary file ({size} bytes); use --bytes A-B for a hex dump of a range", "warning")
+        return 1
+    chunks, start = _sfc_chunks(f, size, path, options)
+    for line in file_reader.hexdump(chunks, start):
+        print(cm.colorize(line, "data_value"))
+    return 0
+
+def stream_sfc(args, lines):
+    """Yields the lines of a file, or of piped input when no file is given."""
+    path, options = _sfc_options(args)
+    if path is None:
+        if options["head"] is not None:
+            yield from itertools.islice(lines, max(options["head"], 0))
+        elif options["tail"] is not None:
+            yield from collections.deque(lines, maxlen=max(options["tail"], 0))
+        else:
+            yield from lines
+        return
+    with open(path, "rb") as f:
+        chunks, _ = _sfc_chunks(f, os.fstat(f.fileno()).st_size, path, options)
+        # surrogateescape lets binary data pass through pipelines unchanged
+        yield from file_reader.split_lines(file_reader.decode_chunks(chunks, "surrogateescape"))
+
 def cmd_sfc(args):
-    """Shows file contents (Simple File Cat)."""
-    if not args:
+    """Shows file contents (Simple File Cat), streamed in chunks."""
+    try:
+        path, options = _sfc_options(args)
+    except ValueError as e:
+        cm.print_colored(f"sfc: {e}", "error")
+        cm.print_colored("Usage: sfc <file> [--head N | --tail N | --bytes A-B] [--follow]", "info")
+        return 1
+    if path is None:
         cm.print_colored("sfc: missing filename", "error")
-        return
+        return 1
     try:
-        with open(args[0], "r") as f:
-            cm.print_colored(f.read(), "data_value")
-    except Exception as e:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if file_reader.is_binary(f):
+                return _sfc_binary(f, size, path, options)
+            text = ""
+            for text in file_reader.decode_chunks(_sfc_chunks(f, size, path, options)[0]):
+                sys.stdout.write(cm.colorize(text, "data_value"))
+                if options["follow"]:
+                    sys.stdout.flush()
+            # Following only ends with Ctrl-C: move past the echoed '^C'
+            if options["follow"] or (text and not text.endswith("\n")):
+                sys.stdout.write("\n")
+            sys.stdout.flush()
+    except (OSError, ValueError) as e:
         cm.print_colored(f"sfc: {e}", "error")
+        return 1
+
+cmd_sfc.stream = stream_sfc
 
 def cmd_cef(args):
     """Creates an empty file (like 'touch')."""
     if not args:
         cm.print_colored("cef: missing filename", "error")
-        return
+        return 1
     try:
         with open(args[0], "a"):
             os.utime(args[0], None)
         cm.print_colored(f"Created or updated {args[0]}", "success")
     except Exception as e:
         cm.print_colored(f"cef: {e}", "error")
+        return 1
+    return 0
 
 def cmd_clear(args):
     """Clears the terminal screen."""
@@ -210,7 +427,8 @@ def config_command(args):
     if not args:
         print(f"{cm.get_color('header')}Aero Configuration:{cm.get_color('reset')}")
         print(f"  username: {config.get('username', 'Aero-User')}")
-        print(f"  color: {'on' if config.get('color', True) else 'off'}")
+        color_setting = config.get('color', True)
+        print(f"  color: {'always' if color_setting == 'always' else 'on' if color_setting else 'off'}")
         print(f"  time_format: {config.get('time_format', '24')} (set to '12' or '24')")
         print(f"  prompt_template: {config.get('prompt_template', DEFAULT_CONFIG['prompt_template'])}")
         
@@ -219,7 +437,7 @@ def config_command(args):
         
         print("\nAvailable config commands:")
         print("  config username <name>         - Set your Aero username")
-        print("  config color on|off            - Enable or disable color")
+        print("  config color on|off|always     - Color on terminals only, never, or always")
         print("  config color <type> <name|code> - Set ANSI color code for type")
         print("  config colors                  - Show examples of all color types")
         print("  config prompt <template>       - Set prompt template (use 'format' cmd for keys)")
@@ -238,10 +456,10 @@ def config_command(args):
         cm.print_colored(f"Username set to {config['username']}", "success")
         
     elif cmd == "color":
-        if len(args) == 2 and args[1] in ("on", "off"):
-            config["color"] = (args[1] == "on")
+        if len(args) == 2 and args[1] in ("on", "off", "always"):
+            config["color"] = "always" if args[1] == "always" else (args[1] == "on")
             cm.save_config()
-            cm.print_colored(f"Color {'enabled' if config['color'] else 'disabled'}", "success")
+            cm.print_colored(f"Color {'disabled' if args[1] == 'off' else 'enabled'}", "success")
         
         elif len(args) == 3:
             color_type = args[1]
@@ -255,7 +473,7 @@ def config_command(args):
             if color_type not in all_color_keys:
                 cm.print_colored(f"Unknown color type '{color_type}'", "error")
                 cm.print_colored(f"Available types: {', '.join(sorted(all_color_keys))}", "info")
-                return
+                return 1
 
             # Remove < > if present
             if color_input.startswith('<') and color_input.endswith('>'):
@@ -280,10 +498,10 @@ def config_command(args):
                 
                 if invalid_parts:
                     cm.print_colored(f"Invalid color/format names: {', '.join(invalid_parts)}", "error")
-                    return
+                    return 1
                 if len(colors_found) > 1:
                     cm.print_colored(f"Error: Cannot combine multiple colors: {', '.join(colors_found)}", "error")
-                    return
+                    return 1
             
             # Handle single color name
             elif color_input.lower() in COLOR_MAP:
@@ -296,14 +514,15 @@ def config_command(args):
             else:
                 cm.print_colored(f"Error: Unknown color/format '{color_input}'", "error")
                 print(f"Available names: {', '.join(sorted(COLOR_MAP.keys()))}")
-                return
+                return 1
             
             config.setdefault("colors", {})[color_type] = final_color_code
             cm.save_config()
             cm.print_colored(f"Color for {color_type} set to '{final_color_code}'", "success")
 
         else:
-            cm.print_colored("Usage: config color on|off OR config color <type> <code|name>", "error")
+            cm.print_colored("Usage: config color on|off|always OR config color <type> <code|name>", "error")
+            return 1
 
     elif cmd == "colors":
         palette = cm.get_color_palette()
@@ -322,12 +541,14 @@ def config_command(args):
             cm.print_colored(f"Time format set to {args[1]}-hour", "success")
         else:
             cm.print_colored("Usage: config time_format 12|24", "error")
+            return 1
 
     elif cmd == "reset":
         config.clear()
+        # Keys DEFAULT_CONFIG leaves out (e.g. 'active_theme') fall back to config_manager's defaults
+        config.update(cm.default_config())
         config.update(DEFAULT_CONFIG.copy())
         cm.save_config()
-        cm.load_config() # Re-load to ensure defaults are populated
         cm.print_colored("Config reset to default.", "success")
 
     elif cmd == "show":
@@ -345,9 +566,11 @@ def config_command(args):
             cm.print_colored("Usage: config prompt <template>", "error")
             print("Example: config prompt \"<green>{username}</green>@<blue>{hostname}</blue> > \"")
             print("Use 'format' command to see all available placeholder keys")
+            return 1
 
     else:
         cm.print_colored("Unknown config command. Run 'config' for help.", "error")
+        return 1
 
 
 def cmd_time(args):
@@ -361,15 +584,13 @@ def cmd_time(args):
         now = datetime.datetime.now()
         timestr = now.strftime(time_fmt_str)
         cm.print_colored(f"Local Time: {timestr}", "data_value")
-        return
+        return 0
         
     # Get time for a specific place
     place = "_".join(args).lower()
     try:
-        context = ssl._create_unverified_context()
-        url = "https://worldtimeapi.org/api/timezone"
-        with urllib.request.urlopen(url, context=context, timeout=5) as resp:
-            zones = json.loads(resp.read().decode())
+        # The list of zones rarely changes; keep it for a day
+        zones = http_cache.fetch_json("https://worldtimeapi.org/api/timezone", ttl=86400)
             
         match = None
         for z in zones:
@@ -379,32 +600,32 @@ def cmd_time(args):
                 
         if not match:
             cm.print_colored(f"Could not find timezone for '{' '.join(args)}'.", "error")
-            return
+            return 1
             
-        url = f"https://worldtimeapi.org/api/timezone/{match}"
-        with urllib.request.urlopen(url, context=context, timeout=5) as resp:
-            data = json.loads(resp.read().decode())
+        # Same host: reuses the pooled connection
+        data = http_client.get_json(f"https://worldtimeapi.org/api/timezone/{match}", timeout=5)
             
         dt = data.get("datetime", "")
         if dt:
             dt_obj = datetime.datetime.fromisoformat(dt)
             timestr = dt_obj.strftime(time_fmt_str)
             cm.print_colored(f"Time in {match}: {timestr}", "data_value")
-        else:
-            cm.print_colored(f"Could not get time for {match}.", "error")
-            
+            return 0
+        cm.print_colored(f"Could not get time for {match}.", "error")
+        return 1
     except Exception as e:
         cm.print_colored(f"time: {e}", "error")
+        return 1
 
 def cmd_help(args):
     """Shows the help message with all available commands."""
     cm.print_colored("Aero Help - Available Commands:", "header")
     help_text = {
-        "ls [dir]": "List files in the current or specified directory",
+        "ls [-laSt1] [path]": "List files (-l long, -a all, -S size, -t time, -1 one per line)",
         "cd [dir]": "Change directory (no args goes to home)",
         "mkdir <dir>": "Make a new directory",
         "pwd": "Print working directory",
-        "sfc <file>": "Show file contents (simple 'cat')",
+        "sfc [file] [opts]": "Show file contents (--head N, --tail N, --bytes A-B, --follow)",
         "cef <file>": "Create empty file (simple 'touch')",
         "clear": "Clear the terminal",
         "pl": "Show installed and available plugins",
@@ -417,7 +638,16 @@ def cmd_help(args):
         "colors": "Show color/format examples",
         "placeholders": "Show available prompt placeholders",
         "ver": "Show Aero and plugin versions",
-        "refresh": "Reloads config and plugins (experimental)",
+        "hist [count]": "Show recent history with exit status, duration and directory",
+        "hist search <query>": "Fuzzy-search the full history (also bound to Ctrl-R)",
+        "hash [-r|-d|-w] [name]": "List, clear or pre-warm the command path cache",
+        "refresh": "Reload config and new, changed or deleted plugins",
+        "cmd | cmd ...": "Pipe output between builtins and external commands",
+        "cmd &": "Run an external command in the background",
+        "jobs [-l]": "List background jobs",
+        "fg / bg [%n]": "Resume a job in the foreground / background",
+        "wait [%n]": "Wait for background jobs to finish",
+        "kill [-SIG] %n|pid": "Send a signal to a job or process",
         "exit / quit": "Exit Aero"
     }
     
@@ -431,54 +661,207 @@ def cmd_ver(args):
     cm.print_colored(f"Aero Version: {__AERO_VERSION__}", "info")
     cm.print_colored("Plugin Versions:", "subheader")
     
-    installed = _get_installed_plugins()
+    installed = pm.plugin_registry()
     if not installed:
         print("  No plugins installed.")
         return
         
-    for plugin in installed:
-        plugin_file = os.path.join(PLUGINS_DIR, f"{plugin}.py")
-        version = "unknown"
-        try:
-            with open(plugin_file, "r") as f:
-                for line in f:
-                    if "__PLUGIN_VERSION__" in line:
-                        version = line.split("=")[1].strip().strip('"\'')
-                        break
-        except Exception:
-            pass
-        print(f"  {cm.colorize(plugin, 'data_primary'):<20}: {cm.colorize(version, 'data_value')}")
+    for plugin, info in installed.items():
+        version = info["version"] or "unknown"
+        details = []
+        if info["load_ms"] is not None:
+            details.append(f"loaded in {info['load_ms']:g} ms")
+        if info["state"] == "failed":
+            details.append(f"failed: {info['error']}")
+        elif info["state"] != "loaded":
+            details.append(info["state"])
+        color = "error" if info["state"] == "failed" else "dim"
+        suffix = f"  {cm.colorize('(' + ', '.join(details) + ')', color)}" if details else ""
+        print(f"  {cm.colorize(plugin, 'data_primary'):<20}: {cm.colorize(version, 'data_value')}{suffix}")
 
 def cmd_refresh(args):
-    """Reloads the config and all plugins."""
+    """Reloads the config and any plugins that changed, keeping the session."""
     cm.print_colored("Refreshing Aero...", "warning")
     
-    # 1. Reload configuration
-    cm.load_config()
-    
-    # 2. Clear terminal
-    cmd_clear([])
-    
-    # 3. Reload plugins
-    # This is tricky. We need to get the main COMMANDS dict.
-    # This implementation is simple and just re-runs the plugin loader.
-    # It assumes the main script will re-pass the COMMANDS dict.
-    # A proper refresh is much more complex and requires clearing old commands.
-    
-    # For this refactor, we need to tell the user to restart.
-    cm.print_colored("Reloading config...", "info")
-    cm.load_config()
+    # 1. Reload configuration (also re-read when config.json looks unchanged)
+    cm.load_config(force=True)
     
-    cm.print_colored("Reloading plugins is not fully supported.", "warning")
-    cm.print_colored("Please 'exit' and restart Aero to apply plugin changes.", "info")
-    
-    # Re-display welcome message
-    config = cm.get_config()
-    print(f"\n{cm.get_color('header')}Aero Mac <-> by, Holden{cm.get_color('reset')}")
-    print(f"{cm.get_color('info')}Version: {__AERO_VERSION__}{cm.get_color('reset')}")
-    print(f"{cm.get_color('success')}Welcome, {config.get('username', 'Aero-User')}{cm.get_color('reset')}")
-    print(f"\n{cm.get_color('warning')}Refresh complete. Config reloaded.{cm.get_color('reset')}")
+    # 2. Re-run only new and modified plugins; drop commands of deleted ones
+    started = time.perf_counter()
+    result = pm.reload_plugins(_COMMANDS)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for outcome, color in (("added", "success"), ("reloaded", "success"), ("removed", "warning"), ("failed", "error")):
+        if result[outcome]:
+            cm.print_colored(f"  {outcome.capitalize()}: {', '.join(result[outcome])}", color)
+    if not any(result.values()):
+        cm.print_colored("  Plugins unchanged.", "info")
+    cm.print_colored(f"Refresh complete in {elapsed_ms:.1f} ms. Config reloaded.", "success")
+
 
+def cmd_hash(args):
+    """Lists, clears or pre-warms the external command hash table."""
+    if not args:
+        if not command_hash.COMMAND_HASH:
+            cm.print_colored("hash: hash table empty", "info")
+            return
+        print(cm.colorize(f"{'hits':>6}  command", "subheader"))
+        for name, path in sorted(command_hash.COMMAND_HASH.items()):
+            hits = command_hash.HITS.get(name, 0)
+            print(f"{hits:>6}  {cm.colorize(path, 'data_value')}")
+        return
+
+    if args[0] == "-r":
+        command_hash.clear()
+        cm.print_colored("Command hash table cleared.", "success")
+    elif args[0] == "-d":
+        for name in args[1:]:
+            command_hash.forget(name)
+    elif args[0] == "-w":
+        count = command_hash.prewarm()
+        cm.print_colored(f"Hashed {count} command(s) from PATH.", "success")
+    elif args[0] in ("help", "-h", "--help"):
+        cm.print_colored("Usage:", "subheader")
+        print("  hash              - List hashed commands and their hit counts")
+        print("  hash <name>...    - Look up and remember the given commands")
+        print("  hash -r           - Forget all hashed commands")
+        print("  hash -d <name>... - Forget the given commands")
+        print("  hash -w           - Pre-warm the table with every executable on PATH")
+    else:
+        status = 0
+        for name in args:
+            if command_hash.lookup(name) is None:
+                cm.print_colored(f"hash: {name}: not found", "error")
+                status = 1
+        return status
+
+def _hist_search(args):
+    """Ranks history matches for a query and offers to put one on the next prompt."""
+    query = " ".join(args)
+    if not query and sys.stdin.isatty():
+        query = input(cm.colorize("hist search: ", "data_key"))
+    if not query.strip():
+        cm.print_colored("Usage: hist search <query>", "error")
+        return 1
+
+    results = history.search(query)
+    if not results:
+        cm.print_colored(f"No history matches for '{query}'.", "warning")
+        return 1
+
+    for number, (score, command, uses, last_used) in reversed(list(enumerate(results, 1))):
+        print(f"  {cm.colorize(str(number).rjust(3), 'data_key')}  {cm.colorize(command, 'data_value')}  "
+              f"{cm.colorize(f'x{uses}', 'dim')}")
+
+    if sys.stdin.isatty():
+        choice = input(cm.colorize("Select a number to edit it on the prompt (Enter to cancel): ", "info")).strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(results):
+            history.prefill_next_input(results[int(choice) - 1][1])
+
+def cmd_hist(args):
+    """Shows the most recent persisted history entries with their metadata."""
+    if not history.is_open():
+        cm.print_colored("hist: command history is disabled or unavailable", "error")
+        return 1
+    if args and args[0] == "search":
+        return _hist_search(args[1:])
+    try:
+        limit = int(args[0]) if args else 20
+    except ValueError:
+        cm.print_colored("Usage: hist [count]", "error")
+        return 1
+
+    for entry_id, command, cwd, exit_status, started_at, duration in history.recent_entries(limit):
+        when = datetime.datetime.fromtimestamp(started_at).strftime("%Y-%m-%d %H:%M:%S")
+        status = "-" if exit_status is None else str(exit_status)
+        status_color = "success" if exit_status == 0 else "error"
+        took = f"{duration:.2f}s" if duration is not None else "-"
+        print(f"  {cm.colorize(str(entry_id).rjust(6), 'dim')}  {when}  "
+              f"{cm.colorize(status.rjust(3), status_color)}  {took:>8}  "
+              f"{cm.colorize(command, 'data_value')}  {cm.colorize(cwd or '', 'dim')}")
+
+def cmd_jobs(args):
+    """Lists background jobs ('-l' adds process ids)."""
+    jobs.reap()
+    for job in sorted(jobs.JOBS.values(), key=lambda j: j.id):
+        print(job.describe(long="-l" in args))
+    # Finished jobs have now been reported
+    for job in [j for j in jobs.JOBS.values() if j.is_done()]:
+        del jobs.JOBS[job.id]
+
+def cmd_fg(args):
+    """Brings a job to the foreground and waits for it."""
+    job = jobs.find_job(args[0] if args else None)
+    if job is None:
+        return 1
+    print(job.command)
+    return jobs.foreground(job)
+
+def cmd_bg(args):
+    """Continues stopped jobs in the background."""
+    status = 0
+    for spec in args or [None]:
+        job = jobs.find_job(spec)
+        if job is None:
+            status = 1
+            continue
+        job.stopped.clear()
+        job.signal(signal.SIGCONT)
+        print(f"[{job.id}]+ {job.command} &")
+    return status
+
+def cmd_wait(args):
+    """Waits for the given jobs (default: all) and returns the last one's status."""
+    targets = [jobs.find_job(spec) for spec in args] if args else sorted(jobs.JOBS.values(), key=lambda j: j.id)
+    status = 0
+    for job in targets:
+        if job is None:
+            status = 127
+            continue
+        job.wait()
+        if job.is_done():
+            status = job.status
+            jobs.JOBS.pop(job.id, None)
+        else:
+            print(job.describe())
+            status = jobs.STOPPED_STATUS
+    return status
+
+def cmd_kill(args):
+    """Sends a signal (default TERM) to jobs ('%n') or process ids."""
+    signum = signal.SIGTERM
+    if args and args[0].startswith("-") and len(args[0]) > 1:
+        name = args.pop(0)[1:].upper()
+        try:
+            signum = int(name) if name.isdigit() else signal.Signals[name if name.startswith("SIG") else "SIG" + name]
+        except (KeyError, ValueError):
+            cm.print_colored(f"kill: {name}: invalid signal specification", "error")
+            return 1
+    if not args:
+        cm.print_colored("Usage: kill [-SIGNAL] %job|pid ...", "error")
+        return 1
+
+    status = 0
+    for target in args:
+        try:
+            if target.startswith("%"):
+                job = jobs.find_job(target)
+                if job is None:
+                    status = 1
+                    continue
+                job.signal(signum)
+                if signum != signal.SIGCONT and job.stopped:
+                    # Stopped processes only act on the signal once continued
+                    job.signal(signal.SIGCONT)
+            else:
+                os.kill(int(target), signum)
+        except ValueError:
+            cm.print_colored(f"kill: {target}: arguments must be process or job IDs", "error")
+            status = 1
+        except OSError as e:
+            cm.print_colored(f"kill: {target}: {e.strerror}", "error")
+            status = 1
+    return status
 
 def cmd_pl(args):
     """Alias for 'installist'."""
@@ -488,12 +871,14 @@ def cmd_mkex(args):
     """Makes a file executable."""
     if not args:
         cm.print_colored("mkex: missing filename", "error")
-        return
+        return 1
     try:
         os.chmod(args[0], 0o755)
         cm.print_colored(f"Made {args[0]} executable", "success")
     except Exception as e:
         cm.print_colored(f"mkex: {e}", "error")
+        return 1
+    return 0
 
 def cmd_format(args):
     """Shows formatting options and examples for the prompt."""
@@ -551,6 +936,15 @@ def cmd_placeholders(args):
 
 # --- Command Registration ---
 
+# The shell's command table, for builtins that change it ('refresh')
+# Builtins that change the shell itself (cwd, config, plugins, job table). A pipeline
+# runs builtins inside the shell process rather than in a subshell, so it rejects these.
+for _command in (cmd_cd, cmd_exit, cmd_refresh, config_command, cmd_colors, install_plugin,
+                 installdelete, cmd_jobs, cmd_fg, cmd_bg, cmd_wait):
+    _command.changes_shell = True
+
+_COMMANDS = {}
+
 def register_core_commands(COMMANDS):
     """
     Registers all built-in commands into the main COMMANDS dictionary.
@@ -558,6 +952,9 @@ def register_core_commands(COMMANDS):
     Args:
         COMMANDS (dict): The main command dictionary to populate.
     """
+    global _COMMANDS
+    _COMMANDS = COMMANDS
+
     # Core file/dir operations
     COMMANDS['ls'] = cmd_ls
     COMMANDS['cd'] = cmd_cd
@@ -573,6 +970,13 @@ def register_core_commands(COMMANDS):
     COMMANDS['clear'] = cmd_clear
     COMMANDS['help'] = cmd_help
     COMMANDS['refresh'] = cmd_refresh
+    COMMANDS['hash'] = cmd_hash
+    COMMANDS['hist'] = cmd_hist
+    COMMANDS['jobs'] = cmd_jobs
+    COMMANDS['fg'] = cmd_fg
+    COMMANDS['bg'] = cmd_bg
+    COMMANDS['wait'] = cmd_wait
+    COMMANDS['kill'] = cmd_kill
     
     # Config & Formatting
     COMMANDS['config'] = config_command
@@ -590,3 +994,25 @@ def register_core_commands(COMMANDS):
     # Utilities
     COMMANDS['time'] = cmd_time
     COMMANDS['ver'] = cmd_ver
+
+    # Prompt placeholders that need more than config_manager provides.
+    # Reading the battery sensor can be slow, so it never blocks the prompt.
+    cm.register_prompt_provider("battery", core.get_battery_percent, ttl=30, background=True, default="N/A")
+
+    # Tab completion for builtin subcommands and arguments
+    completion.register_completion("cd", completer=completion.complete_directory)
+    completion.register_completion("mkdir", completer=completion.complete_directory)
+    completion.register_completion("config", subcommands=[
+        "username", "color", "colors", "prompt", "time_format", "reset", "show"
+    ])
+    completion.register_completion("config color", subcommands=["on", "off", "always"],
+                                   completer=lambda text, args: [] if args else list(cm.COLOR_MAP))
+    completion.register_completion("config time_format", subcommands=["12", "24"])
+    completion.register_completion("hash", subcommands=["-r", "-d", "-w"])
+    completion.register_completion("hist", subcommands=["search"])
+    completion.register_completion("sfc", subcommands=["--head", "--tail", "--bytes", "--follow"],
+                                   completer=completion.complete_file)
+    for name in ("fg", "bg", "wait", "kill"):
+        completion.register_completion(name, completer=lambda text, args: [f"%{job_id}" for job_id in sorted(jobs.JOBS)])
+    completion.register_completion("install", completer=lambda text, args: [])
+    completion.register_completion("installdelete", completer=lambda text, args: _get_installed_plugins())
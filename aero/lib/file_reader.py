@@ -0,0 +1,164 @@
+import os
+import time
+import codecs
+
+# Memory-bounded file reading for 'sfc': files are read in fixed-size chunks and
+# never loaded whole. '--tail' seeks backward from EOF, '--bytes' seeks straight to
+# the range, and '--follow' polls for appended data.
+
+CHUNK_SIZE = 64 * 1024
+# Bytes inspected to decide whether a file is binary
+BINARY_PROBE_SIZE = 8192
+# Seconds between checks for new data with '--follow'
+FOLLOW_INTERVAL = 0.25
+# Lines shown before following, as with 'tail -f'
+DEFAULT_FOLLOW_LINES = 10
+
+
+def is_binary(f):
+    """Returns True if the start of an open binary file contains a NUL byte."""
+    position = f.tell()
+    sample = f.read(BINARY_PROBE_SIZE)
+    f.seek(position)
+    return b"\0" in sample
+
+def parse_range(text, size):
+    """
+    Parses a '--bytes' range 'A-B' (0-based, B exclusive; 'A-' to EOF, '-B' from 0).
+
+    Returns:
+        tuple: (start, end) clamped to the file size.
+    """
+    start_text, dash, end_text = text.partition("-")
+    if not dash:
+        raise ValueError(f"invalid byte range '{text}' (expected A-B)")
+    start = int(start_text) if start_text else 0
+    end = int(end_text) if end_text else size
+    if start < 0 or end < start:
+        raise ValueError(f"invalid byte range '{text}'")
+    return min(start, size), min(end, size)
+
+def read_range(f, start, end):
+    """Yields the bytes between two offsets in chunks."""
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = f.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+def read_head(f, lines):
+    """Yields the first 'lines' lines in chunks, stopping as soon as they have been read."""
+    f.seek(0)
+    while lines > 0:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        count = chunk.count(b"\n")
+        if count < lines:
+            lines -= count
+            yield chunk
+            continue
+        # Cut the chunk right after the last wanted newline
+        end = -1
+        for _ in range(lines):
+            end = chunk.index(b"\n", end + 1)
+        yield chunk[:end + 1]
+        return
+
+def tail_offset(f, size, lines):
+    """Returns the offset where the last 'lines' lines start, reading backward from EOF."""
+    if lines <= 0:
+        return size
+    # A newline at EOF ends the last line instead of starting an empty one
+    limit = size
+    if size:
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            limit = size - 1
+
+    position = limit
+    count = 0
+    while position > 0:
+        read_size = min(CHUNK_SIZE, position)
+        position -= read_size
+        f.seek(position)
+        chunk = f.read(read_size)
+        index = len(chunk)
+        while True:
+            index = chunk.rfind(b"\n", 0, index)
+            if index < 0:
+                break
+            count += 1
+            if count == lines:
+                return position + index + 1
+    return 0
+
+def follow(f, path):
+    """
+    Yields data appended to the file until interrupted (Ctrl-C), reopening it if
+    it is replaced (log rotation) and starting over if it is truncated.
+    """
+    inode = os.fstat(f.fileno()).st_ino
+    try:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if chunk:
+                yield chunk
+                continue
+            time.sleep(FOLLOW_INTERVAL)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue # Being rotated; wait for the new file
+            if st.st_ino != inode:
+                f.close()
+                f = open(path, "rb")
+                inode = st.st_ino
+            elif st.st_size < f.tell():
+                f.seek(0)
+    except KeyboardInterrupt:
+        return
+    finally:
+        f.close()
+
+def decode_chunks(chunks, errors="replace"):
+    """Decodes UTF-8 byte chunks incrementally (multi-byte characters may span chunks)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors)
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+def split_lines(chunks):
+    """Turns text chunks into lines without their newlines."""
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+def hexdump(chunks, offset=0):
+    """Yields 'xxd'-style lines (offset, 16 hex bytes, printable characters)."""
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        whole = len(pending) - len(pending) % 16
+        for start in range(0, whole, 16):
+            yield _hexdump_line(offset, pending[start:start + 16])
+            offset += 16
+        pending = pending[whole:]
+    if pending:
+        yield _hexdump_line(offset, pending)
+
+def _hexdump_line(offset, row):
+    hex_bytes = " ".join(f"{b:02x}" for b in row)
+    text = "".join(chr(b) if 32 <= b < 127 else "." for b in row)
+    return f"{offset:08x}  {hex_bytes:<47}  {text}"
@@ -0,0 +1,306 @@
+import math
+import time
+
+from constants import HISTORY_DB_PATH
+from lazy_imports import try_import
+
+# Persistent command history shared by all Aero sessions.
+# Entries live in an append-only SQLite table in WAL mode, so concurrent sessions
+# can add rows without rewriting the file or blocking each other's readers.
+
+DEFAULT_HISTORY_SIZE = 100000   # Rows kept on disk ('history_size' config key, 0 disables history)
+DEFAULT_HISTORY_LOAD = 1000     # Rows loaded into readline at startup ('history_load' config key)
+COMPACT_EVERY = 100             # Compact after this many inserts from one session
+SEARCH_CANDIDATES = 500         # Index matches ranked in Python per search (most recent first)
+MIN_FUZZY_QUALITY = 0.3         # Minimum share of query trigrams a fuzzy match must contain
+# Put in front of the line by the search key: a control character that can't start a typed command
+SEARCH_MARKER = "\x01"
+
+_conn = None
+# True when SQLite supports the FTS5 trigram tokenizer (SQLite 3.34+)
+_fts = False
+_max_entries = DEFAULT_HISTORY_SIZE
+_inserts_since_compact = 0
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS history (
+        id          INTEGER PRIMARY KEY,
+        command     TEXT NOT NULL,
+        cwd         TEXT,
+        exit_status INTEGER,
+        started_at  REAL NOT NULL,
+        duration    REAL
+    )""",
+    # One row per distinct command line with its use count and last use. A reused
+    # command is re-inserted, so ids are ordered by recency.
+    """CREATE TABLE IF NOT EXISTS commands (
+        id        INTEGER PRIMARY KEY,
+        command   TEXT NOT NULL,
+        uses      INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS commands_command ON commands (command)",
+    "CREATE INDEX IF NOT EXISTS commands_last_used ON commands (last_used)",
+    """CREATE TRIGGER IF NOT EXISTS history_to_commands AFTER INSERT ON history BEGIN
+        INSERT INTO commands (command, uses, last_used) VALUES (
+            new.command,
+            1 + coalesce((SELECT uses FROM commands WHERE command = new.command), 0),
+            new.started_at
+        );
+        DELETE FROM commands WHERE command = new.command AND id < (SELECT MAX(id) FROM commands);
+    END""",
+)
+
+# Trigram index over 'commands', kept in sync by triggers
+_FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS command_trigrams
+        USING fts5(command, content='commands', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS commands_index AFTER INSERT ON commands BEGIN
+        INSERT INTO command_trigrams (rowid, command) VALUES (new.id, new.command);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS commands_unindex AFTER DELETE ON commands BEGIN
+        INSERT INTO command_trigrams (command_trigrams, rowid, command) VALUES ('delete', old.id, old.command);
+    END""",
+)
+
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+def _create_schema(conn, sqlite3):
+    """Creates missing tables, backfilling the search tables for older history databases."""
+    global _fts
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        had_commands = _table_exists(conn, "commands")
+        had_index = _table_exists(conn, "command_trigrams")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        try:
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+            _fts = True
+        except sqlite3.OperationalError:
+            _fts = False # No FTS5 / trigram tokenizer: search falls back to a scan
+
+        if not had_commands:
+            conn.execute(
+                "INSERT INTO commands (command, uses, last_used) "
+                "SELECT command, COUNT(*), MAX(started_at) FROM history GROUP BY command ORDER BY MAX(id)"
+            )
+        elif _fts and not had_index:
+            conn.execute("INSERT INTO command_trigrams (command_trigrams) VALUES ('rebuild')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def open_history(path=HISTORY_DB_PATH, max_entries=DEFAULT_HISTORY_SIZE):
+    """
+    Opens (and if needed creates) the history database.
+
+    Returns:
+        bool: True if history is available, False if disabled or unavailable.
+    """
+    global _conn, _max_entries
+    close()
+    _max_entries = max_entries
+    if max_entries <= 0:
+        return False
+
+    sqlite3 = try_import("sqlite3")
+    if sqlite3 is None:
+        return False
+
+    # Autocommit mode: every insert is its own short transaction
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _create_schema(conn, sqlite3)
+    _conn = conn
+    compact()
+    return True
+
+def close():
+    """Closes the history database if it is open."""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
+
+def is_open():
+    return _conn is not None
+
+def add_entry(command, cwd=None, exit_status=None, started_at=None, duration=None):
+    """Appends one command to the history."""
+    global _inserts_since_compact
+    if _conn is None:
+        return
+    try:
+        _conn.execute(
+            "INSERT INTO history (command, cwd, exit_status, started_at, duration) VALUES (?, ?, ?, ?, ?)",
+            (command, cwd, exit_status, started_at if started_at is not None else time.time(), duration),
+        )
+        _inserts_since_compact += 1
+        if _inserts_since_compact >= COMPACT_EVERY:
+            compact()
+    except Exception:
+        pass # History is best-effort (e.g. the database is locked); never break the command loop
+
+def compact():
+    """
+    Trims the history to the configured size.
+
+    Rows are only ever appended, so ids are contiguous apart from the range
+    already trimmed; deleting by id range uses the primary key and never scans.
+    """
+    global _inserts_since_compact
+    _inserts_since_compact = 0
+    if _conn is None:
+        return
+    _conn.execute(
+        "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?",
+        (_max_entries,),
+    )
+    # Forget commands that were last used before the oldest remaining entry
+    _conn.execute("DELETE FROM commands WHERE last_used < (SELECT MIN(started_at) FROM history)")
+
+def recent_entries(limit):
+    """Returns the last 'limit' entries as (id, command, cwd, exit_status, started_at, duration), oldest first."""
+    if _conn is None:
+        return []
+    rows = _conn.execute(
+        "SELECT id, command, cwd, exit_status, started_at, duration FROM history ORDER BY id DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    rows.reverse()
+    return rows
+
+def recent_commands(limit):
+    """Returns the last 'limit' command lines, oldest first."""
+    if _conn is None:
+        return []
+    rows = _conn.execute("SELECT command FROM history ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [row[0] for row in reversed(rows)]
+
+def load_into_readline(readline_module, limit):
+    """Replaces readline's in-memory history with the last 'limit' persisted commands."""
+    readline_module.clear_history()
+    for command in recent_commands(limit):
+        readline_module.add_history(command)
+
+
+# --- Search ---
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _fts_phrase(text):
+    """Quotes text as an FTS5 phrase (substring match with the trigram tokenizer)."""
+    return '"' + text.replace('"', '""') + '"'
+
+def _candidates(needle):
+    """Returns (id, command, uses, last_used) rows that may match, most recent first."""
+    if _fts and len(needle) >= 3:
+        sql = (
+            "SELECT c.id, c.command, c.uses, c.last_used FROM command_trigrams "
+            "JOIN commands c ON c.id = command_trigrams.rowid "
+            "WHERE command_trigrams MATCH ? ORDER BY command_trigrams.rowid DESC LIMIT ?"
+        )
+        rows = _conn.execute(sql, (_fts_phrase(needle), SEARCH_CANDIDATES)).fetchall()
+        if len(rows) < SEARCH_CANDIDATES:
+            # Not enough exact substring hits: widen to anything sharing a trigram
+            fuzzy = " OR ".join(_fts_phrase(gram) for gram in sorted(_trigrams(needle)))
+            seen = {row[0] for row in rows}
+            rows += [row for row in _conn.execute(sql, (fuzzy, SEARCH_CANDIDATES)).fetchall()
+                     if row[0] not in seen]
+        return rows
+
+    # Short queries (or no FTS5): scan from the most recent command and stop early
+    return _conn.execute(
+        "SELECT id, command, uses, last_used FROM commands "
+        "WHERE instr(lower(command), ?) ORDER BY id DESC LIMIT ?",
+        (needle, SEARCH_CANDIDATES),
+    ).fetchall()
+
+def search(query, limit=20):
+    """
+    Fuzzy-searches the persisted history.
+
+    Candidates come from the trigram index; each is scored on match quality
+    (prefix > substring > share of query trigrams), recency and frequency.
+
+    Returns:
+        list: (score, command, uses, last_used) tuples, best match first.
+    """
+    needle = query.strip().lower()
+    if _conn is None or not needle:
+        return []
+
+    rows = _candidates(needle)
+    query_grams = _trigrams(needle)
+    max_uses = max((row[2] for row in rows), default=1)
+    now = time.time()
+
+    results = []
+    for _, command, uses, last_used in rows:
+        lowered = command.lower()
+        if lowered.startswith(needle):
+            quality = 1.5
+        elif needle in lowered:
+            quality = 1.0
+        elif query_grams:
+            quality = len(query_grams & _trigrams(lowered)) / len(query_grams)
+            if quality < MIN_FUZZY_QUALITY:
+                continue
+        else:
+            continue
+        recency = 1 / (1 + max(now - last_used, 0) / 86400)  # 1.0 now, 0.5 a day ago, ...
+        frequency = math.log1p(uses) / math.log1p(max_uses)
+        results.append((3 * quality + recency + frequency, command, uses, last_used))
+
+    results.sort(key=lambda result: result[0], reverse=True)
+    return results[:limit]
+
+def prefill_next_input(text):
+    """Pre-fills the next readline prompt with 'text' so it can be edited or run."""
+    readline = try_import("readline")
+    if readline is None:
+        return False
+
+    def hook():
+        readline.insert_text(text)
+        readline.redisplay()
+        readline.set_pre_input_hook(None)
+
+    readline.set_pre_input_hook(hook)
+    return True
+
+def bind_search_key(readline_module, key):
+    """
+    Binds 'key' (readline syntax, e.g. '\\C-r') to search history for the current line.
+
+    The key submits the line with SEARCH_MARKER in front (see search_request()); the
+    line itself is never parsed or run. Only GNU readline supports the keyboard macro
+    used here; with libedit this is a no-op.
+    """
+    if not key or "libedit" in (readline_module.__doc__ or ""):
+        return False
+    # Start of line, quoted-insert of SEARCH_MARKER (Ctrl-A), submit
+    readline_module.parse_and_bind(f'"{key}": "\\C-a\\C-v\\C-a\\C-m"')
+    return True
+
+def search_request(line, readline_module):
+    """
+    Returns the query if 'line' was submitted with the search key, or None.
+
+    The submitted line is also dropped from readline's history, so only commands
+    that actually run end up there.
+    """
+    if not line.startswith(SEARCH_MARKER):
+        return None
+    length = readline_module.get_current_history_length()
+    if length:
+        readline_module.remove_history_item(length - 1)
+    return line[len(SEARCH_MARKER):].strip()
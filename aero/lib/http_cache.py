@@ -0,0 +1,132 @@
+import os
+import time
+import json
+import threading
+
+import http_client
+from constants import HTTP_CACHE_DIR
+from lazy_imports import lazy_import
+hashlib = lazy_import("hashlib")
+http = lazy_import("http.client")
+
+# On-disk cache for the repository catalog requests ('pl', 'theme list',
+# 'update list', ...). A response younger than its TTL is served without any
+# request; an older one is revalidated with If-None-Match / If-Modified-Since, so
+# an unchanged catalog costs a 304 (which GitHub does not count against the API
+# rate limit). When the network is unreachable, the last copy is served instead.
+#
+# Each URL is stored as two files named after the SHA-1 of the URL: '<key>.body'
+# (the raw response) and '<key>.json' (url, etag, last_modified, fetched_at).
+
+# Seconds a cached response is used without revalidating it
+DEFAULT_TTL = 600
+# Seconds to wait for the server
+DEFAULT_TIMEOUT = 5
+# HTTP errors that say nothing about the resource itself (rate limits, outages),
+# answered with the cached copy if there is one
+TRANSIENT_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+class CacheMiss(Exception):
+    """The request failed and there is no cached copy to fall back on."""
+
+
+def _paths(url):
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.body"), os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+def _read_entry(url):
+    """Returns (metadata, body) for a cached URL, or (None, None)."""
+    body_path, meta_path = _paths(url)
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(meta, dict) or meta.get("url") != url:
+        return None, None
+    return meta, body
+
+def _write_file(path, data):
+    """Writes a file atomically (temp file + rename), so readers never see half of it."""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def _write_entry(url, meta, body=None):
+    """Stores metadata (and the body, unless it is unchanged); cache errors are not fatal."""
+    body_path, meta_path = _paths(url)
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        if body is not None:
+            _write_file(body_path, body)
+        _write_file(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError:
+        pass # Served uncached next time
+
+def _request(url, meta, timeout):
+    """
+    Performs the (conditional) request.
+
+    Returns:
+        tuple: (status, headers, body), with status 304 when the cached copy is current.
+    """
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    response = http_client.get(url, headers, timeout).raise_for_status()
+    if response.status == 304:
+        return 304, response.headers, None
+    return response.status, response.headers, response.body
+
+def fetch(url, ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the body of a GET request, from the cache when possible.
+
+    Args:
+        ttl (float): Seconds a cached copy is served without asking the server.
+        timeout (float): Seconds to wait for the server.
+
+    Raises:
+        CacheMiss: The request failed and nothing is cached, or the server
+            answered with an error other than TRANSIENT_STATUSES (e.g. 404).
+    """
+    meta, body = _read_entry(url)
+    now = time.time()
+    if meta is not None and now - meta.get("fetched_at", 0) < ttl:
+        return body
+
+    try:
+        status, headers, new_body = _request(url, meta, timeout)
+    except http_client.HTTPError as e:
+        if meta is not None and e.status in TRANSIENT_STATUSES:
+            return body
+        raise CacheMiss(f"HTTP {e.status} for {url}") from e
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        # Offline, DNS failure, timeout, ...: stale data beats no data
+        if meta is not None:
+            return body
+        raise CacheMiss(str(e)) from e
+
+    if status == 304 and meta is not None:
+        meta["fetched_at"] = now
+        _write_entry(url, meta)
+        return body
+
+    _write_entry(url, {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": now,
+    }, new_body)
+    return new_body
+
+def fetch_json(url, ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT):
+    """fetch() for JSON APIs: returns the decoded response."""
+    return json.loads(fetch(url, ttl, timeout).decode("utf-8"))
@@ -0,0 +1,247 @@
+import os
+import json
+import time
+import threading
+
+from lazy_imports import lazy_import
+http = lazy_import("http.client")
+ssl = lazy_import("ssl")
+gzip = lazy_import("gzip")
+socket = lazy_import("socket")
+select = lazy_import("select")
+urllib = lazy_import("urllib.parse")
+
+# Shared HTTP(S) client for Aero and its plugins. Connections are kept alive and
+# pooled per host, so a run of requests to one server (e.g. 'update plugins')
+# pays for the TCP and TLS handshakes once. One TLS context serves every
+# connection, responses are requested gzip-compressed, and every request has a
+# timeout and retries transient failures.
+#
+#   response = http_client.get(url)           # any status; body is bytes
+#   data = http_client.get_json(url)          # raises HTTPError for 4xx/5xx
+#   http_client.download(url, path)           # atomic write to 'path'
+
+# Seconds to wait for the server (connect, and each read)
+DEFAULT_TIMEOUT = 10
+# Extra attempts for GET/HEAD after a connection error or a RETRY_STATUSES response
+DEFAULT_RETRIES = 2
+# Seconds before the first retry, doubled for each further one
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {502, 503, 504}
+# Methods that are safe to send twice
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+# Idle connections kept open per (scheme, host, port)
+MAX_IDLE_PER_HOST = 8
+USER_AGENT = "aero-shell"
+
+# (scheme, host, port) -> idle connections, most recently used last
+_idle = {}
+_pool_lock = threading.Lock()
+_ssl_context = None
+
+
+class HTTPError(Exception):
+    """An error status (4xx/5xx), raised by Response.raise_for_status()."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status} {response.reason} for {response.url}")
+        self.status = response.status
+        self.response = response
+
+class Response:
+    """A complete response, with the body read and decompressed."""
+
+    def __init__(self, url, status, reason, headers, body):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def raise_for_status(self):
+        """Raises HTTPError for 4xx/5xx statuses; returns the response otherwise."""
+        if self.status >= 400:
+            raise HTTPError(self)
+        return self
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+# --- Connection Pool ---
+
+def _context():
+    """The TLS context shared by all connections (created on first use)."""
+    global _ssl_context
+    if _ssl_context is None:
+        # Unverified, as Aero's downloads have always been
+        _ssl_context = ssl._create_unverified_context()
+    return _ssl_context
+
+def _is_dropped(conn):
+    """True if the server has closed an idle connection (it is readable: EOF or stray data)."""
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+def _acquire(key, timeout):
+    """Returns (connection, reused): an idle pooled connection, or a new one."""
+    while True:
+        with _pool_lock:
+            idle = _idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None or conn.sock is None or not _is_dropped(conn):
+            break
+        conn.close()
+    if conn is not None:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+    scheme, host, port = key
+    if scheme == "https":
+        return http.client.HTTPSConnection(host, port, timeout=timeout, context=_context()), False
+    return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+def _release(key, conn):
+    """Puts a connection back in the pool (or closes it if the pool is full)."""
+    with _pool_lock:
+        idle = _idle.setdefault(key, [])
+        if len(idle) < MAX_IDLE_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+def close_all():
+    """Closes every idle pooled connection."""
+    with _pool_lock:
+        connections = [conn for idle in _idle.values() for conn in idle]
+        _idle.clear()
+    for conn in connections:
+        conn.close()
+
+def _after_fork():
+    # A forked child (e.g. an 'aero --server' request) must not share the parent's sockets
+    global _pool_lock
+    _idle.clear()
+    _pool_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+# --- Requests ---
+
+def _send(method, url, headers, body, timeout):
+    """Sends one request and reads the whole response."""
+    parts = urllib.parse.urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"unsupported URL: {url}")
+    key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    all_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+    all_headers.update(headers or {})
+
+    while True:
+        conn, reused = _acquire(key, timeout)
+        sent = False
+        try:
+            conn.request(method, target, body=body, headers=all_headers)
+            sent = True
+            raw = conn.getresponse()
+            data = raw.read()
+        except ConnectionError:
+            conn.close()
+            # The server may have closed the idle connection just as it was reused: try a
+            # new one, unless the request got out and sending it again could repeat it
+            if reused and (not sent or method in IDEMPOTENT_METHODS):
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+        break
+
+    if raw.will_close:
+        conn.close()
+    else:
+        _release(key, conn)
+    if data and (raw.getheader("Content-Encoding") or "").lower() == "gzip":
+        data = gzip.decompress(data)
+    return Response(url, raw.status, raw.reason, raw.headers, data)
+
+def request(method, url, headers=None, body=None, timeout=DEFAULT_TIMEOUT, retries=None):
+    """
+    Performs an HTTP(S) request on a pooled keep-alive connection, following redirects.
+
+    Args:
+        headers (dict): Extra request headers.
+        body (bytes): Request body.
+        timeout (float): Seconds to wait for the server.
+        retries (int): Extra attempts after a connection error or a RETRY_STATUSES
+            response. Defaults to DEFAULT_RETRIES for IDEMPOTENT_METHODS and 0
+            otherwise; other requests are never sent twice.
+
+    Returns:
+        Response: The final response, whatever its status (see Response.raise_for_status()).
+
+    Raises:
+        OSError, http.client.HTTPException: No response could be obtained.
+    """
+    if retries is None:
+        retries = DEFAULT_RETRIES if method in IDEMPOTENT_METHODS else 0
+
+    for _ in range(MAX_REDIRECTS + 1):
+        for attempt in range(retries + 1):
+            try:
+                response = _send(method, url, headers, body, timeout)
+            except socket.gaierror:
+                raise # Unknown host or offline: retrying won't help
+            except (OSError, http.client.HTTPException):
+                if attempt == retries:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt == retries:
+                    break
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+        location = response.headers.get("Location")
+        if response.status not in REDIRECT_STATUSES or not location:
+            return response
+        url = urllib.parse.urljoin(url, location)
+        if response.status == 303 or (response.status in (301, 302) and method == "POST"):
+            method, body = "GET", None
+    return response
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET request; returns the Response whatever its status."""
+    return request("GET", url, headers=headers, timeout=timeout)
+
+def get_json(url, headers=None, timeout=DEFAULT_TIMEOUT):
+    """GET request for a JSON API; raises HTTPError for error statuses."""
+    return get(url, headers, timeout).raise_for_status().json()
+
+def download(url, dest, timeout=DEFAULT_TIMEOUT):
+    """
+    Saves the body of 'url' to 'dest' through a temporary file, so 'dest' is
+    never left half-written. Raises HTTPError for error statuses.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    body = get(url, timeout=timeout).raise_for_status().body
+    temp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(body)
+        os.replace(temp_path, dest)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(body)
@@ -0,0 +1,249 @@
+import os
+import sys
+import signal
+
+import command_hash
+import config_manager as cm
+from lazy_imports import lazy_import
+subprocess = lazy_import("subprocess")
+
+# Job control for external commands started with a trailing '&'.
+# Every job runs in its own process group, so Ctrl-C/Ctrl-Z at the prompt never
+# reach it and 'fg' can hand it the terminal. Children are reaped with
+# waitpid(WNOHANG) before each prompt, where finished jobs are reported.
+
+# Job id -> Job
+JOBS = {}
+
+# Exit status reported for a job stopped in the foreground (128 + SIGTSTP)
+STOPPED_STATUS = 128 + signal.SIGTSTP
+
+
+class Job:
+    """One background pipeline: its processes, process group and state."""
+
+    def __init__(self, job_id, command, processes):
+        self.id = job_id
+        self.command = command
+        self.processes = processes
+        self.pgid = processes[0].pid
+        self.stopped = set() # pids currently stopped
+
+    def _wait(self, process, options):
+        """Collects a state change of one process; returns False if there was none."""
+        try:
+            pid, wait_status = os.waitpid(process.pid, options)
+        except ChildProcessError:
+            # Already reaped elsewhere; treat as finished
+            if process.returncode is None:
+                process.returncode = 0
+            return True
+        if pid == 0:
+            return False
+        if os.WIFSTOPPED(wait_status):
+            self.stopped.add(pid)
+        elif os.WIFCONTINUED(wait_status):
+            self.stopped.discard(pid)
+        else:
+            self.stopped.discard(pid)
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+        return True
+
+    def update(self):
+        """Polls every unfinished process without blocking."""
+        for process in self.processes:
+            if process.returncode is None:
+                while self._wait(process, os.WNOHANG | os.WUNTRACED | os.WCONTINUED):
+                    if process.returncode is not None:
+                        break
+
+    def wait(self):
+        """Blocks until the job finishes or is stopped."""
+        for process in self.processes:
+            while process.returncode is None:
+                self._wait(process, os.WUNTRACED)
+                if self.stopped:
+                    return
+
+    def is_done(self):
+        return all(process.returncode is not None for process in self.processes)
+
+    @property
+    def state(self):
+        if self.is_done():
+            returncode = self.processes[-1].returncode
+            if returncode < 0:
+                return signal.Signals(-returncode).name
+            return "Done" if returncode == 0 else f"Exit {returncode}"
+        return "Stopped" if self.stopped else "Running"
+
+    @property
+    def status(self):
+        """Shell-style exit status of the last process (128 + N if killed by signal N)."""
+        returncode = self.processes[-1].returncode
+        if returncode is None:
+            return None
+        return 128 - returncode if returncode < 0 else returncode
+
+    def signal(self, signum):
+        os.killpg(self.pgid, signum)
+
+    def describe(self, long=False):
+        marker = "+" if self is current_job() else " "
+        pids = " ".join(str(p.pid) for p in self.processes) + " " if long else ""
+        return f"[{self.id}]{marker} {pids}{self.state:<10} {self.command}"
+
+
+# --- Job Table ---
+
+def split_background(line):
+    """Returns (line, background) with a trailing unquoted '&' removed."""
+    stripped = line.rstrip()
+    if stripped.endswith("&") and not stripped.endswith(("&&", "\\&")):
+        return stripped[:-1].rstrip(), True
+    return line, False
+
+def _group_options(pgid):
+    """Popen arguments that put the child in process group 'pgid' (0: a new group it leads)."""
+    if sys.version_info >= (3, 11):
+        return {"process_group": pgid}
+    # Python 3.10 has no 'process_group': join the group between fork and exec
+    return {"preexec_fn": lambda: os.setpgid(0, pgid)}
+
+def current_job():
+    """The job 'fg' and 'bg' use by default: the most recently started one."""
+    return JOBS[max(JOBS)] if JOBS else None
+
+def start(stages, command, COMMANDS):
+    """
+    Starts a pipeline of external commands in the background.
+
+    Returns:
+        int: 0 if the job started, 1 on error, 127 if a command was not found.
+    """
+    for argv in stages:
+        if argv[0] in COMMANDS:
+            cm.print_colored(f"aero: {argv[0]}: builtins cannot run in the background", "error")
+            return 1
+
+    cm.flush_output()
+    processes = []
+    previous_stdout = None
+    try:
+        for index, argv in enumerate(stages):
+            executable = command_hash.lookup(argv[0])
+            if executable is None:
+                cm.print_colored(f"aero: command not found: {argv[0]}", "error")
+                return 127
+            is_last = index == len(stages) - 1
+            process = subprocess.Popen(
+                argv,
+                executable=executable,
+                stdin=previous_stdout,
+                stdout=None if is_last else subprocess.PIPE,
+                # Join the group of the first process (0 creates a new group)
+                **_group_options(processes[0].pid if processes else 0),
+            )
+            if previous_stdout is not None:
+                previous_stdout.close()
+            previous_stdout = process.stdout
+            processes.append(process)
+    except OSError as e:
+        command_hash.forget(stages[len(processes)][0])
+        cm.print_colored(f"aero: {e}", "error")
+        return 127
+    finally:
+        if previous_stdout is not None and len(processes) < len(stages):
+            previous_stdout.close()
+        if len(processes) < len(stages):
+            # Part of the pipeline failed to start; don't leave the rest orphaned
+            for process in processes:
+                process.kill()
+                process.wait()
+
+    job = Job(max(JOBS, default=0) + 1, command, processes)
+    JOBS[job.id] = job
+    print(f"[{job.id}] {processes[-1].pid}")
+    return 0
+
+def find_job(spec):
+    """
+    Resolves a job spec ('%n', '%+', '%%', '%name' or 'n') to a job.
+
+    Returns None (after printing an error) if no job matches.
+    """
+    if spec is None:
+        job = current_job()
+        if job is None:
+            cm.print_colored("aero: no current job", "error")
+        return job
+    text = spec[1:] if spec.startswith("%") else spec
+    if text in ("", "+", "%"):
+        return find_job(None)
+    if text.isdigit():
+        job = JOBS.get(int(text))
+    else:
+        # '%name': the most recent job whose command starts with 'name'
+        job = next((j for j in sorted(JOBS.values(), key=lambda j: -j.id) if j.command.startswith(text)), None)
+    if job is None:
+        cm.print_colored(f"aero: {spec}: no such job", "error")
+    return job
+
+def reap():
+    """Updates every job's state without blocking."""
+    for job in JOBS.values():
+        job.update()
+
+def notify():
+    """Reports and forgets jobs that finished since the last prompt."""
+    if not JOBS:
+        return
+    reap()
+    for job in [j for j in JOBS.values() if j.is_done()]:
+        print(job.describe())
+        del JOBS[job.id]
+
+def foreground(job):
+    """
+    Gives a job the terminal, continues it and waits until it finishes or stops.
+
+    Returns:
+        int: The job's exit status, or STOPPED_STATUS if it was stopped again.
+    """
+    cm.flush_output()
+    tty = sys.stdin.fileno() if sys.stdin.isatty() else None
+    if tty is not None:
+        # tcsetpgrp from a background group raises SIGTTOU unless it is ignored
+        previous_handler = signal.signal(signal.SIGTTOU, signal.SIG_IGN)
+        os.tcsetpgrp(tty, job.pgid)
+    try:
+        job.stopped.clear()
+        job.signal(signal.SIGCONT)
+        job.wait()
+    finally:
+        if tty is not None:
+            os.tcsetpgrp(tty, os.getpgrp())
+            signal.signal(signal.SIGTTOU, previous_handler)
+
+    if not job.is_done():
+        print()
+        print(job.describe())
+        return STOPPED_STATUS
+    if job.processes[-1].returncode == -signal.SIGINT:
+        print() # Move past the '^C' echoed by the terminal
+    del JOBS[job.id]
+    return job.status
+
+def hangup_stopped():
+    """
+    Sends SIGHUP (then SIGCONT, so it is acted on) to stopped jobs when Aero exits.
+    Running jobs are left alone, as in bash without 'huponexit'.
+    """
+    reap()
+    for job in JOBS.values():
+        if job.stopped and not job.is_done():
+            try:
+                job.signal(signal.SIGHUP)
+                job.signal(signal.SIGCONT)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,52 @@
+# Deferred imports for modules that only a few commands need.
+#
+#   urllib = lazy_import("urllib.request")   # nothing is imported yet
+#   urllib.request.urlopen(url)              # 'urllib.request' is imported here, once
+#
+# Like a plain 'import a.b' statement, the proxy stands in for the top-level package.
+
+_MISSING = object()
+# Results of try_import(): module name -> module, or None if it is not installed
+_OPTIONAL_MODULES = {}
+
+
+class LazyModule:
+    """Module proxy that performs the real import on first attribute access."""
+
+    def __init__(self, name):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_module", None)
+
+    def _load(self):
+        module = self._lazy_module
+        if module is None:
+            # __import__("a.b") imports a.b and returns the top-level package 'a'
+            module = __import__(self._lazy_name)
+            object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module '{self._lazy_name}' ({state})>"
+
+
+def lazy_import(name):
+    """Returns a LazyModule for 'name'; the import happens on first use."""
+    return LazyModule(name)
+
+def try_import(name):
+    """Imports an optional dependency on first call, returning None if it is not installed."""
+    module = _OPTIONAL_MODULES.get(name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = __import__(name)
+        except ImportError:
+            module = None
+        _OPTIONAL_MODULES[name] = module
+    return module
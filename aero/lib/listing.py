@@ -0,0 +1,193 @@
+import os
+import stat
+import time
+import operator
+
+from lazy_imports import try_import
+
+# Directory listings for 'ls', built on os.scandir(): entry types come from the
+# directory read itself, and each entry is stat()ed at most once (DirEntry caches
+# it), only when a size, time or permission bits are actually needed.
+
+# Color key for each entry type
+TYPE_COLORS = {
+    "dir": "data_primary",
+    "link": "data_secondary",
+    "exec": "success",
+    "file": "data_value",
+}
+COLUMN_GAP = 2
+# 'ls -l' shows the year instead of the time for entries older than this (as GNU ls)
+RECENT_SECONDS = 180 * 86400
+
+_owner_names = {}
+_group_names = {}
+
+
+class PathEntry:
+    """DirEntry-like wrapper for a path given directly to 'ls' (e.g. a file)."""
+
+    def __init__(self, path):
+        self.name = path
+        self.path = path
+        self._lstat = os.lstat(path)
+
+    def is_symlink(self):
+        return stat.S_ISLNK(self._lstat.st_mode)
+
+    def is_dir(self, follow_symlinks=True):
+        if follow_symlinks and self.is_symlink():
+            return os.path.isdir(self.path)
+        return stat.S_ISDIR(self._lstat.st_mode)
+
+    def stat(self, follow_symlinks=True):
+        if follow_symlinks and self.is_symlink():
+            return os.stat(self.path)
+        return self._lstat
+
+
+def scan(path, show_all=False):
+    """Returns the DirEntry objects of a directory, skipping dotfiles unless 'show_all'."""
+    with os.scandir(path) as entries:
+        if show_all:
+            return list(entries)
+        return [entry for entry in entries if not entry.name.startswith(".")]
+
+def entry_type(entry, st=None):
+    """
+    Returns 'link', 'dir', 'exec' or 'file'.
+
+    Without a stat result only the type recorded by the directory read is used
+    (no syscall), so executables are not told apart from other files.
+    """
+    if st is not None:
+        if stat.S_ISLNK(st.st_mode):
+            return "link"
+        if stat.S_ISDIR(st.st_mode):
+            return "dir"
+        return "exec" if st.st_mode & 0o111 else "file"
+    try:
+        if entry.is_symlink():
+            return "link"
+        if entry.is_dir(follow_symlinks=False):
+            return "dir"
+    except OSError:
+        pass
+    return "file"
+
+def _stat_or_none(entry):
+    try:
+        return entry.stat(follow_symlinks=False)
+    except OSError:
+        return None
+
+def sort_entries(entries, by="name"):
+    """Sorts by name, or by 'size'/'time' (largest/newest first, then by name)."""
+    entries.sort(key=operator.attrgetter("name"))
+    if by == "size":
+        entries.sort(key=lambda entry: getattr(_stat_or_none(entry), "st_size", 0), reverse=True)
+    elif by == "time":
+        entries.sort(key=lambda entry: getattr(_stat_or_none(entry), "st_mtime", 0), reverse=True)
+    return entries
+
+
+# --- Formatting ---
+
+def _owner(uid):
+    name = _owner_names.get(uid)
+    if name is None:
+        pwd = try_import("pwd")
+        try:
+            name = pwd.getpwuid(uid).pw_name if pwd else str(uid)
+        except KeyError:
+            name = str(uid)
+        _owner_names[uid] = name
+    return name
+
+def _group(gid):
+    name = _group_names.get(gid)
+    if name is None:
+        grp = try_import("grp")
+        try:
+            name = grp.getgrgid(gid).gr_name if grp else str(gid)
+        except KeyError:
+            name = str(gid)
+        _group_names[gid] = name
+    return name
+
+def long_lines(entries, colorize):
+    """
+    Formats entries as 'ls -l' lines: mode, links, owner, group, size, mtime, name.
+
+    Args:
+        colorize (callable): colorize(text, color_key), e.g. cm.colorize.
+    """
+    now = time.time()
+    # Formatted modes and times (by minute): entries in one directory often share them
+    modes = {}
+    mtimes = {}
+    rows = []
+    for entry in entries:
+        st = _stat_or_none(entry)
+        kind = entry_type(entry, st)
+        name = colorize(entry.name, TYPE_COLORS[kind])
+        if kind == "link":
+            try:
+                name += " -> " + os.readlink(entry.path)
+            except OSError:
+                pass
+        if st is None:
+            rows.append(("?" * 10, "?", "?", "?", "?", "?", name))
+            continue
+        minute = int(st.st_mtime // 60)
+        mtime = mtimes.get(minute)
+        if mtime is None:
+            mtime_format = "%b %d %H:%M" if abs(now - st.st_mtime) < RECENT_SECONDS else "%b %d  %Y"
+            mtime = mtimes[minute] = time.strftime(mtime_format, time.localtime(st.st_mtime))
+        mode = modes.get(st.st_mode)
+        if mode is None:
+            mode = modes[st.st_mode] = stat.filemode(st.st_mode)
+        rows.append((
+            mode,
+            str(st.st_nlink),
+            _owner(st.st_uid),
+            _group(st.st_gid),
+            str(st.st_size),
+            mtime,
+            name,
+        ))
+    if not rows:
+        return []
+
+    links_width, owner_width, group_width, size_width = (
+        max(map(len, column)) for column in list(zip(*rows))[1:5]
+    )
+    return [
+        f"{mode} {links:>{links_width}} {owner:<{owner_width}} {group:<{group_width}} "
+        f"{size:>{size_width}} {mtime} {name}"
+        for mode, links, owner, group, size, mtime, name in rows
+    ]
+
+def column_lines(entries, colorize, width):
+    """
+    Lays names out in columns filled top to bottom (as 'ls' on a terminal).
+    All columns share the width of the longest name, which keeps this O(n).
+    """
+    if not entries:
+        return []
+    names = [entry.name for entry in entries]
+    cell = max(len(name) for name in names) + COLUMN_GAP
+    columns = max(1, (width + COLUMN_GAP) // cell)
+    rows = -(-len(names) // columns)
+    colored = [colorize(entry.name, TYPE_COLORS[entry_type(entry)]) for entry in entries]
+
+    lines = []
+    for row in range(rows):
+        cells = []
+        for index in range(row, len(names), rows):
+            if index + rows < len(names):
+                cells.append(colored[index] + " " * (cell - len(names[index])))
+            else:
+                cells.append(colored[index]) # Last column: no trailing padding
+        lines.append("".join(cells))
+    return lines
@@ -0,0 +1,305 @@
+import os
+import sys
+import shlex
+
+import command_hash
+import config_manager as cm
+from lazy_imports import lazy_import
+subprocess = lazy_import("subprocess")
+threading = lazy_import("threading")
+
+# '|' pipelines between builtins and external commands.
+#
+# Adjacent builtins are chained in-process as generators: a builtin with a
+# 'stream' attribute (stream(args, lines) -> iterator of lines) consumes the
+# previous stage's lines and yields its own. External commands are connected
+# with real OS pipes, so external-to-external stages never pass through Python.
+# Nothing is ever read in full: memory use is bounded by one line per stage
+# plus the kernel pipe buffers.
+#
+# Builtins run inside the shell process, not in a subshell, so builtins that
+# change the shell itself (marked 'changes_shell', e.g. 'cd') are rejected.
+
+# Text encoding for builtin stages; surrogateescape lets arbitrary bytes pass through
+ENCODING = sys.getfilesystemencoding()
+ERRORS = "surrogateescape"
+
+
+class PipelineError(Exception):
+    """Raised for malformed pipelines (e.g. an empty stage)."""
+
+
+def split_commands(line):
+    """Splits a line into command strings on unquoted ';'."""
+    if ";" not in line:
+        return [line]
+    commands = []
+    start = 0
+    quote = None
+    escaped = False
+    for i, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quote != "'":
+            escaped = True
+        elif quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == ";":
+            commands.append(line[start:i])
+            start = i + 1
+    commands.append(line[start:])
+    return [command.strip() for command in commands if command.strip()]
+
+def split_pipeline(line):
+    """
+    Splits a command line into stages (lists of words) on unquoted '|'.
+
+    Lines without a '|' take the plain shlex.split() fast path.
+    """
+    if "|" not in line:
+        return [shlex.split(line)]
+
+    lexer = shlex.shlex(line, posix=True, punctuation_chars="|")
+    lexer.whitespace_split = True
+    lexer.commenters = "" # Match shlex.split(): '#' is not a comment
+    stages = [[]]
+    for token in lexer:
+        if token == "|":
+            stages.append([])
+        elif set(token) == {"|"}:
+            raise PipelineError(f"aero: syntax error near '{token}'")
+        else:
+            stages[-1].append(token)
+    if any(not stage for stage in stages):
+        raise PipelineError("aero: syntax error near '|'")
+    return stages
+
+
+# --- Builtin output capture ---
+
+class _StdoutRouter:
+    """sys.stdout replacement that lets each thread print to its own target."""
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "target", None) or self._default
+
+    def redirect(self, target):
+        self._local.target = target
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+def _stdout_router():
+    if not isinstance(sys.stdout, _StdoutRouter):
+        sys.stdout = _StdoutRouter(sys.stdout)
+    return sys.stdout
+
+def _captured_lines(func, args, status):
+    """
+    Runs a non-streaming builtin on a worker thread with its prints sent into an
+    OS pipe, and yields what it prints line by line as it is produced. Its exit
+    status is stored in status[0].
+    """
+    read_fd, write_fd = os.pipe()
+    writer = os.fdopen(write_fd, "w", encoding=ENCODING, errors=ERRORS)
+    router = _stdout_router()
+
+    def run():
+        router.redirect(writer)
+        # The output feeds the next command, not the terminal
+        cm.set_plain_output(True)
+        errors_before = cm.errors_printed()
+        try:
+            result = func(args)
+            # As for a command run on its own: an int is the status, otherwise printed errors mean failure
+            if isinstance(result, int):
+                status[0] = result
+            elif cm.errors_printed() > errors_before:
+                status[0] = 1
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            _report_error(args, e)
+            status[0] = 1
+        finally:
+            router.redirect(None)
+            cm.set_plain_output(False)
+            try:
+                writer.close()
+            except BrokenPipeError:
+                pass
+
+    worker = threading.Thread(target=run, name="aero-pipeline-builtin", daemon=True)
+    worker.start()
+    with os.fdopen(read_fd, "r", encoding=ENCODING, errors=ERRORS) as reader:
+        for line in reader:
+            yield line.rstrip("\n")
+    worker.join()
+
+def _report_error(name, error):
+    print(f"aero: {name}: {error}", file=sys.__stderr__)
+
+
+# --- Stages ---
+
+def _read_lines(reader):
+    """Yields lines (without newlines) from a text reader."""
+    for line in reader:
+        yield line.rstrip("\n")
+
+def _builtin_segment(COMMANDS, stages, input_fd):
+    """
+    Chains a run of consecutive builtin stages into one iterator of lines.
+
+    Returns:
+        tuple: (lines, reader, status), where 'reader' is the input pipe (None without
+            input). Builtins may never read it to the end (e.g. 'ls' ignores it), so the
+            caller closes it once the segment is drained; the producer then sees EPIPE.
+            'status' is a one-item list holding the last builtin's exit status once the
+            segment is drained.
+    """
+    reader = os.fdopen(input_fd, "r", encoding=ENCODING, errors=ERRORS) if input_fd is not None else None
+    lines = _read_lines(reader) if reader is not None else iter(())
+    for argv in stages:
+        func = COMMANDS[argv[0]]
+        stream = getattr(func, "stream", None)
+        status = [0]
+        if stream is not None:
+            lines = stream(argv[1:], lines)
+        else:
+            # Non-streaming builtins ignore their input; release the pipe right away
+            if reader is not None:
+                reader.close()
+            lines = _captured_lines(func, argv[1:], status)
+    return lines, reader, status
+
+def _write_segment(lines, output_fd, name, reader=None):
+    """
+    Drains a builtin segment into an OS pipe (or stdout when output_fd is None),
+    then closes the segment's input pipe 'reader'.
+    """
+    out = os.fdopen(output_fd, "w", encoding=ENCODING, errors=ERRORS) if output_fd is not None else sys.stdout
+    status = 0
+    try:
+        for line in lines:
+            out.write(line)
+            out.write("\n")
+    except BrokenPipeError:
+        pass # The next stage exited early (e.g. 'head'); stop producing
+    except Exception as e:
+        _report_error(name, e)
+        status = 1
+    finally:
+        try:
+            if output_fd is not None:
+                out.close()
+            else:
+                out.flush()
+        except BrokenPipeError:
+            pass
+        if reader is not None:
+            reader.close()
+    return status
+
+
+def run_pipeline(stages, COMMANDS):
+    """
+    Runs a pipeline and returns the exit status of its last stage.
+
+    Args:
+        stages (list): Stages as lists of words, from split_pipeline().
+        COMMANDS (dict): The main command dictionary (builtins and plugins).
+    """
+    for argv in stages:
+        if getattr(COMMANDS.get(argv[0]), "changes_shell", False):
+            cm.print_colored(f"aero: {argv[0]}: cannot be used in a pipeline", "error")
+            return 1
+
+    # External stages write to the terminal directly; keep output in order
+    cm.flush_output()
+
+    # Group stages into runs of builtins and single external commands
+    segments = []
+    for argv in stages:
+        if argv[0] in COMMANDS:
+            if segments and segments[-1][0] == "builtin":
+                segments[-1][1].append(argv)
+            else:
+                segments.append(("builtin", [argv]))
+        else:
+            segments.append(("external", argv))
+
+    processes = []
+    threads = []
+    statuses = []
+    input_fd = None
+    last_builtin = None
+
+    for index, (kind, payload) in enumerate(segments):
+        is_last = index == len(segments) - 1
+        read_fd, write_fd = (None, None) if is_last else os.pipe()
+
+        if kind == "external":
+            argv = payload
+            executable = command_hash.lookup(argv[0])
+            if executable is None:
+                cm.print_colored(f"aero: command not found: {argv[0]}", "error")
+                statuses.append(127)
+                # Nobody will read the input or write the output of this stage
+                for fd in (input_fd, write_fd):
+                    if fd is not None:
+                        os.close(fd)
+            else:
+                try:
+                    processes.append((len(statuses), subprocess.Popen(
+                        argv, executable=executable, stdin=input_fd, stdout=write_fd
+                    )))
+                    statuses.append(None)
+                except OSError as e:
+                    command_hash.forget(argv[0])
+                    cm.print_colored(f"aero: {argv[0]}: {e}", "error")
+                    statuses.append(127)
+                finally:
+                    # The child holds its own copies of these descriptors
+                    for fd in (input_fd, write_fd):
+                        if fd is not None:
+                            os.close(fd)
+        else:
+            lines, reader, status = _builtin_segment(COMMANDS, payload, input_fd)
+            name = payload[-1][0]
+            statuses.append(0)
+            if is_last:
+                last_builtin = (len(statuses) - 1, lines, name, reader, status)
+            else:
+                slot = len(statuses) - 1
+                def drain(slot=slot, lines=lines, fd=write_fd, name=name, reader=reader, status=status):
+                    statuses[slot] = _write_segment(lines, fd, name, reader) or status[0]
+                thread = threading.Thread(target=drain, name="aero-pipeline", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        input_fd = read_fd
+
+    # A trailing builtin segment runs on the main thread, writing to the terminal
+    if last_builtin is not None:
+        slot, lines, name, reader, status = last_builtin
+        statuses[slot] = _write_segment(lines, None, name, reader) or status[0]
+
+    for slot, process in processes:
+        statuses[slot] = process.wait()
+    for thread in threads:
+        thread.join()
+    return statuses[-1]
@@ -1,50 +1,676 @@
 import os
-import importlib.util
 import sys
+import json
+import time
+import threading
+
+# Only needed when a plugin is new, changed or actually called
+from lazy_imports import lazy_import
+hashlib = lazy_import("hashlib")
+importlib = lazy_import("importlib.util")
 
 # Import constants and config functions
-from constants import PLUGINS_DIR
+from constants import PLUGINS_DIR, PLUGIN_MANIFEST_PATH
+import startup_profiler as sp
+import completion
+import command_hash
 try:
+    import config_manager as cm
     from config_manager import print_colored
 except ImportError:
+    cm = None
     # Fallback if config_manager isn't fully loaded yet
     def print_colored(text, color_key):
         colors = {"success": "\033[32m", "error": "\033[31m", "reset": "\033[0m"}
         print(f"{colors.get(color_key, '')}{text}{colors['reset']}")
 
 
-def load_plugins(COMMANDS):
+# Bump this whenever the layout of a manifest entry changes
+MANIFEST_VERSION = 4
+
+# Commands registered by each plugin that has actually been imported this session
+PLUGIN_REGISTRATIONS = {}
+# Prompt placeholders registered by each plugin (its own or its stubs): {name: PromptProvider}
+PLUGIN_PROVIDERS = {}
+# Tab completions declared by each plugin (its own or its stubs): {command path: spec}
+PLUGIN_COMPLETIONS = {}
+# __PLUGIN_VERSION__ and import time of each imported plugin: {"version", "load_ms"}
+PLUGIN_INFO = {}
+# New or changed plugins not imported yet (non-interactive mode): module name -> file path
+DEFERRED_PLUGINS = {}
+# Plugins being imported on background threads (interactive mode): module name -> PluginLoad
+PENDING_PLUGINS = {}
+# Seconds a plugin may take to import before it is reported as slow, unless
+# config.json sets 'plugin_load_budget' (a number, or {plugin name: seconds, "default": seconds})
+DEFAULT_LOAD_BUDGET = 1.0
+# Manifest entry of every plugin registered this session (as stubs or imported), or
+# of its failed load: module name -> entry. This is the plugin registry that 'ver',
+# 'pl' and reload_plugins() work from; it is persisted as the manifest.
+PLUGIN_ENTRIES = {}
+
+
+# --- Manifest Helpers ---
+
+def _file_signature(filepath):
+    """Returns the (mtime_ns, size) pair used as the cheap staleness check."""
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+def _file_hash(filepath):
+    """Returns the SHA-1 of a plugin file's contents."""
+    digest = hashlib.sha1()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest():
+    """Reads the plugin manifest from disk, returning {} if it is missing or outdated."""
+    try:
+        with open(PLUGIN_MANIFEST_PATH, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("plugins", {})
+
+def save_manifest(entries):
+    """Atomically writes the plugin manifest (temp file + rename)."""
+    # Per-process temp file: other sessions (or a forked '--server' child) may be saving too
+    temp_path = f"{PLUGIN_MANIFEST_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "plugins": entries}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, PLUGIN_MANIFEST_PATH)
+    except OSError as e:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        print_colored(f"Warning: Could not write plugin manifest: {e}", "warning")
+
+
+# --- Plugin Import ---
+
+def _collect_registrations(module_name, register, *args):
+    """
+    Calls register(*args) and records the prompt placeholders and completions it
+    registers as the plugin's own (PLUGIN_PROVIDERS, PLUGIN_COMPLETIONS). Only
+    registrations made on this thread are recorded, so plugins loading on other
+    threads (see PluginLoad) can't be credited with each other's.
+    """
+    providers, completions = {}, {}
+    if cm:
+        cm.record_prompt_providers(providers)
+    completion.record_completions(completions)
+    try:
+        result = register(*args)
+    finally:
+        if cm:
+            cm.record_prompt_providers(None)
+        completion.record_completions(None)
+    PLUGIN_PROVIDERS[module_name] = providers
+    PLUGIN_COMPLETIONS[module_name] = completions
+    return result
+
+def _import_plugin(module_name, filepath):
+    """
+    Executes a plugin file and collects the commands it registers.
+
+    Returns:
+        dict | None: {command_name: function}, or None if the plugin has no
+        'register_plugin_commands' function.
     """
-    Loads all .py files from the PLUGINS_DIR and registers their commands.
-    
+    started = time.perf_counter()
+    spec = importlib.util.spec_from_file_location(module_name, filepath)
+    if spec is None:
+        raise ImportError(f"Cannot create a module spec for {filepath}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    register = getattr(module, "register_plugin_commands", None)
+    if register is None:
+        return None
+    registered = {}
+    _collect_registrations(module_name, register, registered)
+    version = getattr(module, "__PLUGIN_VERSION__", None)
+    PLUGIN_INFO[module_name] = {
+        "version": str(version) if version is not None else None,
+        "load_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return registered
+
+def activate_plugin(COMMANDS, module_name, filepath):
+    """
+    Imports a plugin (once per session) and installs its real commands into COMMANDS,
+    replacing any lazy stubs that were registered for it.
+    """
+    if module_name in PLUGIN_REGISTRATIONS:
+        return PLUGIN_REGISTRATIONS[module_name]
+
+    registered = _import_plugin(module_name, filepath)
+    if registered is None:
+        return None
+
+    # Drop stubs for commands the plugin no longer provides
+    for name, command in list(COMMANDS.items()):
+        if isinstance(command, LazyCommand) and command.module_name == module_name and name not in registered:
+            del COMMANDS[name]
+    COMMANDS.update(registered)
+    PLUGIN_REGISTRATIONS[module_name] = registered
+    return registered
+
+
+class LazyCommand:
+    """Stand-in for a plugin command that imports the plugin on its first call."""
+
+    def __init__(self, COMMANDS, module_name, filepath, name):
+        self.COMMANDS = COMMANDS
+        self.module_name = module_name
+        self.filepath = filepath
+        self.name = name
+        self.__doc__ = f"'{name}' command from the '{module_name}' plugin (not loaded yet)."
+
+    def __call__(self, args):
+        try:
+            registered = activate_plugin(self.COMMANDS, self.module_name, self.filepath)
+        except Exception as e:
+            print_colored(f"[Aero Error] Failed to load plugin {os.path.basename(self.filepath)}: {e}", "error")
+            return None
+
+        command = (registered or {}).get(self.name)
+        if command is None:
+            self.COMMANDS.pop(self.name, None)
+            print_colored(f"Plugin '{self.module_name}' no longer provides the '{self.name}' command.", "error")
+            return None
+        return command(args)
+
+
+def _lazy_provider(COMMANDS, module_name, filepath, name):
+    """Returns a prompt provider function that imports its plugin on first render."""
+    def provide():
+        try:
+            activate_plugin(COMMANDS, module_name, filepath)
+        except Exception as e:
+            print_colored(f"[Aero Error] Failed to load plugin {os.path.basename(filepath)}: {e}", "error")
+            # Render the placeholder empty instead of retrying on every prompt
+            cm.register_prompt_provider(name, lambda: "")
+            PLUGIN_PROVIDERS.setdefault(module_name, {})[name] = cm.PROMPT_PLACEHOLDERS[name]
+            return ""
+        provider = cm.PROMPT_PLACEHOLDERS.get(name)
+        if provider is None or provider.func is provide:
+            return ""
+        return provider.get()
+    return provide
+
+
+def _lazy_completer(COMMANDS, module_name, filepath, command):
+    """Returns an argument completer that imports its plugin on the first Tab press."""
+    def complete(text, args):
+        try:
+            activate_plugin(COMMANDS, module_name, filepath)
+        except Exception:
+            return []
+        spec = completion.COMPLETIONS.get(tuple(command.split()))
+        if spec is None or spec["completer"] in (None, complete):
+            return []
+        return spec["completer"](text, args)
+    return complete
+
+
+# --- Loader ---
+
+def _register_plugin(COMMANDS, manifest, filename, module_name, filepath, defer=False, background=False):
+    """
+    Registers one plugin, from its manifest entry if still valid or by importing it.
+    With 'defer', a plugin that would need importing is added to DEFERRED_PLUGINS
+    instead; with 'background', it is imported by a PluginLoad thread.
+
+    Returns:
+        dict | None: The plugin's (possibly rebuilt) manifest entry, or None if the
+        plugin could not be registered (or was deferred or is loading).
+    """
+    mtime_ns, size = _file_signature(filepath)
+    entry = manifest.get(filename)
+    if entry and entry.get("error"):
+        entry = None # Failed last time; try again
+    if entry and (entry.get("mtime_ns"), entry.get("size")) != (mtime_ns, size):
+        # Touched (e.g. re-downloaded) but maybe not modified: compare contents
+        if entry.get("sha1") == _file_hash(filepath):
+            entry = dict(entry, mtime_ns=mtime_ns, size=size)
+        else:
+            entry = None
+
+    if entry is not None:
+        for name in entry.get("commands", []):
+            COMMANDS[name] = LazyCommand(COMMANDS, module_name, filepath, name)
+        _collect_registrations(module_name, _register_stubs, COMMANDS, module_name, filepath, entry)
+        return entry
+
+    if defer:
+        DEFERRED_PLUGINS[module_name] = filepath
+        return None
+    if background:
+        previous = manifest.get(filename) or {}
+        load = PluginLoad(module_name, filepath, mtime_ns, size, _load_budget(module_name),
+                          previous.get("commands", []))
+        PENDING_PLUGINS[module_name] = load
+        load.start()
+        return None
+
+    sha1 = _file_hash(filepath)
+    registered = activate_plugin(COMMANDS, module_name, filepath)
+    if registered is None:
+        raise MissingRegisterError(module_name)
+    return _manifest_entry(module_name, mtime_ns, size, sha1, registered)
+
+def _register_stubs(COMMANDS, module_name, filepath, entry):
+    """Registers the placeholders and completions of a manifest entry as lazy stubs."""
+    if cm:
+        for name in entry.get("providers", []):
+            cm.register_prompt_provider(name, _lazy_provider(COMMANDS, module_name, filepath, name))
+    for command, spec in entry.get("completions", {}).items():
+        completer = _lazy_completer(COMMANDS, module_name, filepath, command) if spec.get("dynamic") else None
+        completion.register_completion(command, spec.get("subcommands", []), completer)
+
+class MissingRegisterError(Exception):
+    """A plugin file defines no 'register_plugin_commands' function."""
+
+    def __init__(self, module_name):
+        super().__init__(f"Plugin '{module_name}' is missing 'register_plugin_commands' function.")
+
+def _manifest_entry(module_name, mtime_ns, size, sha1, registered):
+    """Builds the manifest entry of a plugin that has just been imported."""
+    info = PLUGIN_INFO.get(module_name, {})
+    return {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha1": sha1,
+        "version": info.get("version"),
+        "load_ms": info.get("load_ms"),
+        "error": None,
+        "commands": sorted(registered),
+        "providers": sorted(PLUGIN_PROVIDERS.get(module_name, {})),
+        "completions": {
+            " ".join(path): {"subcommands": spec["subcommands"], "dynamic": spec["completer"] is not None}
+            for path, spec in PLUGIN_COMPLETIONS.get(module_name, {}).items()
+        },
+    }
+
+def _failed_entry(module_name, filepath, error):
+    """
+    Records a failed load in the registry and returns its entry. Commands the
+    plugin registered before (e.g. an older version, on 'refresh') stay listed,
+    as they stay installed.
+    """
+    if isinstance(error, MissingRegisterError):
+        print_colored(f"Warning: {error}", "warning")
+    else:
+        print_colored(f"[Aero Error] Failed to load plugin {os.path.basename(filepath)}: {error}", "error")
+    entry = dict(PLUGIN_ENTRIES.get(module_name) or {"commands": [], "providers": [], "completions": {}})
+    try:
+        entry["mtime_ns"], entry["size"] = _file_signature(filepath)
+    except OSError:
+        pass
+    entry["error"] = str(error)
+    PLUGIN_ENTRIES[module_name] = entry
+    return entry
+
+def load_plugins(COMMANDS, defer=False, background=False):
+    """
+    Registers commands from all plugins in the plugins/ directory.
+
+    Plugins whose file is unchanged since the last run (same mtime/size, or same
+    content hash) are not imported: their commands are registered as LazyCommand
+    stubs from the cached manifest. New or modified plugins are imported right
+    away and the manifest is rebuilt for them.
+
     Args:
         COMMANDS (dict): The main command dictionary to populate.
+        defer (bool): Don't import new or modified plugins now; resolve_command()
+            imports them when a script uses a command nothing else provides.
+        background (bool): Import new or modified plugins on background threads
+            instead of blocking; install_loaded_plugins() adds their commands.
+            Ignored while startup profiling is enabled.
+
+    Returns:
+        int: The number of plugins registered.
     """
-    if not os.path.isdir(PLUGINS_DIR):
-        return
-    
+    # A startup profile must time the real imports (not stubs) and save the manifest
+    if sp.enabled():
+        background = False
+
+    # Ensure plugins directory exists
+    os.makedirs(PLUGINS_DIR, exist_ok=True)
+
+    # Add plugins directory to path so plugins can import their siblings
+    if PLUGINS_DIR not in sys.path:
+        sys.path.append(PLUGINS_DIR)
+
+    manifest = load_manifest()
+    new_manifest = {}
     loaded = 0
-    for fname in os.listdir(PLUGINS_DIR):
-        if fname.endswith(".py") and not fname.startswith("_"):
-            fpath = os.path.join(PLUGINS_DIR, fname)
+
+    for filename in sorted(os.listdir(PLUGINS_DIR)):
+        if not filename.endswith(".py") or filename.startswith("_"):
+            continue
+        module_name = filename[:-3]
+        filepath = os.path.join(PLUGINS_DIR, filename)
+
+        try:
+            with sp.phase(module_name, "plugin"):
+                entry = _register_plugin(COMMANDS, manifest, filename, module_name, filepath, defer, background)
+        except Exception as e:
+            new_manifest[filename] = _failed_entry(module_name, filepath, e)
+            continue
+        if module_name in PENDING_PLUGINS:
+            loaded += 1
+            continue
+        if module_name in DEFERRED_PLUGINS:
+            # Keep the outdated entry until resolve_command() imports the plugin
+            if filename in manifest:
+                new_manifest[filename] = manifest[filename]
+            loaded += 1
+            continue
+        if entry is None:
+            continue
+
+        new_manifest[filename] = entry
+        PLUGIN_ENTRIES[module_name] = entry
+        loaded += 1
+
+    if new_manifest != manifest:
+        save_manifest(new_manifest)
+
+    return loaded
+
+def activate_all(COMMANDS):
+    """Imports every plugin still registered as lazy stubs (e.g. for 'aero --server')."""
+    for command in list(COMMANDS.values()):
+        if isinstance(command, LazyCommand) and command.module_name not in PLUGIN_REGISTRATIONS:
             try:
-                # Create a module spec from the file path
-                spec = importlib.util.spec_from_file_location(fname[:-3], fpath)
-                # Create a module from the spec
-                mod = importlib.util.module_from_spec(spec)
-                # Add module to sys.modules to allow relative imports within plugins
-                sys.modules[spec.name] = mod
-                # Execute the module's code
-                spec.loader.exec_module(mod)
-                
-                # Look for a 'register' function in the loaded module
-                if hasattr(mod, "register"):
-                    # Call the register function, passing it the COMMANDS dict
-                    mod.register(COMMANDS)
-                
-                loaded += 1
+                activate_plugin(COMMANDS, command.module_name, command.filepath)
             except Exception as e:
-                print_colored(f"Failed to load plugin {fname}: {e}", "error")
-                
-    if loaded > 0:
-        print_colored(f"Loaded {loaded} plugin(s)", "success")
+                print_colored(f"[Aero Error] Failed to load plugin {os.path.basename(command.filepath)}: {e}", "error")
+
+def resolve_command(COMMANDS, name):
+    """
+    Imports deferred plugins one at a time until one of them provides 'name'.
+
+    Returns:
+        bool: True if 'name' is now in COMMANDS.
+    """
+    if PENDING_PLUGINS:
+        # The command may come from a plugin still loading in the background. Only wait
+        # for it if the plugin's previous version had the command or nothing on PATH
+        # does, so external commands never wait for a slow plugin.
+        expected = any(name in load.previous_commands for load in PENDING_PLUGINS.values())
+        if expected or command_hash.lookup(name, count_hit=False) is None:
+            install_loaded_plugins(COMMANDS, wait=True)
+    while name not in COMMANDS and DEFERRED_PLUGINS:
+        module_name = next(iter(DEFERRED_PLUGINS))
+        filepath = DEFERRED_PLUGINS.pop(module_name)
+        filename = os.path.basename(filepath)
+        try:
+            entry = _register_plugin(COMMANDS, {}, filename, module_name, filepath)
+            PLUGIN_ENTRIES[module_name] = entry
+        except Exception as e:
+            entry = _failed_entry(module_name, filepath, e)
+        # Remember it so the next run registers it without importing
+        manifest = load_manifest()
+        manifest[filename] = entry
+        save_manifest(manifest)
+    return name in COMMANDS
+
+
+# --- Background Loading ---
+
+def _load_budget(module_name):
+    """Returns the import time budget (seconds) for a plugin, from 'plugin_load_budget'."""
+    budget = cm.get_config("plugin_load_budget") if cm else None
+    if isinstance(budget, dict):
+        budget = budget.get(module_name, budget.get("default"))
+    try:
+        return float(budget) if budget is not None else DEFAULT_LOAD_BUDGET
+    except (TypeError, ValueError):
+        return DEFAULT_LOAD_BUDGET
+
+class PluginLoad:
+    """
+    Imports one plugin on a daemon thread so that a slow plugin (network I/O or
+    heavy work at import time) can't hold up the prompt.
+
+    Threads can't be interrupted, so the budget is not enforced by killing the
+    import: the prompt never waits for it, its commands are added whenever it
+    finishes, and exceeding the budget is reported.
+    """
+
+    def __init__(self, module_name, filepath, mtime_ns, size, budget, previous_commands=()):
+        self.module_name = module_name
+        self.filepath = filepath
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.budget = budget
+        # Commands listed in the manifest for the plugin's previous version (none if new)
+        self.previous_commands = previous_commands
+        self.started = None
+        self.elapsed = None
+        self.registered = None
+        self.entry = None
+        self.error = None
+        self.reported_slow = False
+        self.done = threading.Event()
+
+    def start(self):
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, name=f"aero-plugin-{self.module_name}", daemon=True).start()
+
+    def _run(self):
+        try:
+            sha1 = _file_hash(self.filepath)
+            self.registered = _import_plugin(self.module_name, self.filepath)
+            if self.registered is None:
+                raise MissingRegisterError(self.module_name)
+            self.entry = _manifest_entry(self.module_name, self.mtime_ns, self.size, sha1, self.registered)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.elapsed = time.monotonic() - self.started
+            self.done.set()
+
+    def remaining(self):
+        """Seconds left in the budget (0 once it is used up)."""
+        return max(0.0, self.started + self.budget - time.monotonic())
+
+def install_loaded_plugins(COMMANDS, wait=False):
+    """
+    Adds the commands of background plugin loads that have finished, and reports
+    failures and plugins over their budget. Runs on the main thread (before each
+    prompt), so COMMANDS never changes under a running command or completion.
+
+    Args:
+        wait (bool): First wait for unfinished loads, each for at most the rest of its budget.
+
+    Returns:
+        int: The number of plugins whose load finished (installed or failed).
+    """
+    installed = {}
+    for module_name, load in list(PENDING_PLUGINS.items()):
+        if wait:
+            load.done.wait(load.remaining())
+        if not load.done.is_set():
+            if not load.reported_slow and not load.remaining():
+                load.reported_slow = True
+                print_colored(f"Plugin '{module_name}' is still loading after {load.budget:g}s; "
+                              "its commands will be added when it is ready.", "warning")
+            continue
+
+        del PENDING_PLUGINS[module_name]
+        if load.error is not None:
+            installed[f"{module_name}.py"] = _failed_entry(module_name, load.filepath, load.error)
+            continue
+        if load.elapsed > load.budget:
+            print_colored(f"Plugin '{module_name}' took {load.elapsed:.2f}s to load (budget {load.budget:g}s).", "warning")
+        COMMANDS.update(load.registered)
+        PLUGIN_REGISTRATIONS[module_name] = load.registered
+        PLUGIN_ENTRIES[module_name] = load.entry
+        installed[f"{module_name}.py"] = load.entry
+
+    if installed:
+        # Remember them so the next start registers them without importing
+        manifest = load_manifest()
+        manifest.update(installed)
+        save_manifest(manifest)
+    return len(installed)
+
+
+# --- Reload ---
+
+def _owns(COMMANDS, module_name, name):
+    """True if COMMANDS[name] is still the plugin's own command (not overridden since)."""
+    command = COMMANDS.get(name)
+    if isinstance(command, LazyCommand):
+        return command.module_name == module_name
+    return command is not None and PLUGIN_REGISTRATIONS.get(module_name, {}).get(name) is command
+
+def _plugin_files():
+    """Returns {module name: path} for the plugin files currently in PLUGINS_DIR."""
+    if not os.path.isdir(PLUGINS_DIR):
+        return {}
+    return {
+        filename[:-3]: os.path.join(PLUGINS_DIR, filename)
+        for filename in sorted(os.listdir(PLUGINS_DIR))
+        if filename.endswith(".py") and not filename.startswith("_")
+    }
+
+def reload_plugins(COMMANDS):
+    """
+    Brings COMMANDS in line with the plugins/ directory without restarting ('refresh').
+
+    Only new plugins and plugins whose contents changed (by mtime/size, then
+    SHA-1) are executed again; unchanged ones keep their commands and state.
+    Commands, prompt placeholders and completions of deleted plugins are removed.
+    Every changed plugin is imported before COMMANDS is touched, so one that
+    fails to load keeps its previous commands, and the new commands are
+    installed before the old ones are dropped.
+
+    Returns:
+        dict: Module names by outcome: "reloaded", "added", "removed", "failed".
+    """
+    result = {"reloaded": [], "added": [], "removed": [], "failed": []}
+    present = _plugin_files()
+    staged = {} # module name -> (new manifest entry, registered commands)
+    # What each plugin registered before any is imported again (importing replaces these)
+    old_providers = dict(PLUGIN_PROVIDERS)
+    old_completions = dict(PLUGIN_COMPLETIONS)
+
+    for module_name, filepath in present.items():
+        if module_name in PENDING_PLUGINS:
+            continue # Still loading; installed by install_loaded_plugins()
+        old_entry = PLUGIN_ENTRIES.get(module_name)
+        try:
+            mtime_ns, size = _file_signature(filepath)
+            # A plugin that failed last time is always tried again
+            unchanged = old_entry and not old_entry.get("error")
+            if unchanged and (old_entry.get("mtime_ns"), old_entry.get("size")) == (mtime_ns, size):
+                continue
+            sha1 = _file_hash(filepath)
+            if unchanged and old_entry.get("sha1") == sha1:
+                PLUGIN_ENTRIES[module_name] = dict(old_entry, mtime_ns=mtime_ns, size=size)
+                continue
+            registered = _import_plugin(module_name, filepath)
+            if registered is None:
+                raise MissingRegisterError(module_name)
+        except Exception as e:
+            _failed_entry(module_name, filepath, e)
+            result["failed"].append(module_name)
+            continue
+        staged[module_name] = (_manifest_entry(module_name, mtime_ns, size, sha1, registered), registered)
+        result["reloaded" if old_entry and old_entry.get("commands") else "added"].append(module_name)
+
+    removed = [module_name for module_name in PLUGIN_ENTRIES if module_name not in present]
+    result["removed"] = removed
+
+    # Commands to drop: those of removed plugins, and those changed plugins no longer register
+    stale = set()
+    new_commands = {}
+    for module_name in removed + list(staged):
+        old_entry = PLUGIN_ENTRIES.get(module_name)
+        if old_entry:
+            stale.update(name for name in old_entry.get("commands", []) if _owns(COMMANDS, module_name, name))
+    for entry, registered in staged.values():
+        new_commands.update(registered)
+    stale.difference_update(new_commands)
+
+    COMMANDS.update(new_commands)
+    for name in stale:
+        COMMANDS.pop(name, None)
+
+    # Placeholders and completions the new versions (or removed plugins) no longer
+    # provide, unless another plugin has registered its own under the same name since
+    for module_name in removed + list(staged):
+        new_providers = PLUGIN_PROVIDERS.get(module_name, {}) if module_name in staged else {}
+        new_completions = PLUGIN_COMPLETIONS.get(module_name, {}) if module_name in staged else {}
+        if cm:
+            for name, provider in old_providers.get(module_name, {}).items():
+                if name not in new_providers and cm.PROMPT_PLACEHOLDERS.get(name) is provider:
+                    del cm.PROMPT_PLACEHOLDERS[name]
+        for path, spec in old_completions.get(module_name, {}).items():
+            if path not in new_completions and completion.COMPLETIONS.get(path) is spec:
+                del completion.COMPLETIONS[path]
+
+    for module_name in removed:
+        PLUGIN_ENTRIES.pop(module_name, None)
+        PLUGIN_REGISTRATIONS.pop(module_name, None)
+        PLUGIN_PROVIDERS.pop(module_name, None)
+        PLUGIN_COMPLETIONS.pop(module_name, None)
+        DEFERRED_PLUGINS.pop(module_name, None)
+    for module_name, (entry, registered) in staged.items():
+        PLUGIN_ENTRIES[module_name] = entry
+        PLUGIN_REGISTRATIONS[module_name] = registered
+        DEFERRED_PLUGINS.pop(module_name, None)
+
+    manifest = load_manifest()
+    new_manifest = dict(manifest)
+    for module_name in removed:
+        new_manifest.pop(f"{module_name}.py", None)
+    for module_name, entry in PLUGIN_ENTRIES.items():
+        new_manifest[f"{module_name}.py"] = entry
+    if new_manifest != manifest:
+        save_manifest(new_manifest)
+    return result
+
+
+# --- Registry ---
+
+def plugin_registry():
+    """
+    Returns metadata for every installed plugin, from what was recorded when
+    plugins were loaded (no directory listing or file reads):
+    {name: {"version", "commands", "load_ms", "error", "state"}}, sorted by name.
+
+    'state' is "loaded" (imported or registered from the manifest), "failed",
+    "loading" (background import still running) or "deferred" (not imported
+    yet in script mode).
+    """
+    def describe(entry, state=None):
+        return {
+            "version": entry.get("version"),
+            "commands": list(entry.get("commands", [])),
+            "load_ms": entry.get("load_ms"),
+            "error": entry.get("error"),
+            "state": state or ("failed" if entry.get("error") else "loaded"),
+        }
+
+    registry = {module_name: describe(entry) for module_name, entry in PLUGIN_ENTRIES.items()}
+    for module_name in PENDING_PLUGINS:
+        registry.setdefault(module_name, describe({}, "loading"))
+    if DEFERRED_PLUGINS:
+        # Not imported in this run: show what the manifest recorded last time
+        manifest = load_manifest()
+        for module_name in DEFERRED_PLUGINS:
+            registry.setdefault(module_name, describe(manifest.get(f"{module_name}.py", {}), "deferred"))
+    return dict(sorted(registry.items()))
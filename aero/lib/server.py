@@ -0,0 +1,174 @@
+import os
+import sys
+import signal
+import socket
+
+import client
+import config_manager as cm
+
+# 'aero --server': keeps config, the command table and plugins loaded in one
+# long-lived process listening on a Unix socket (see client.py for the protocol).
+# Every request runs in a child forked from the warm server, so it starts with
+# everything already imported and its cwd, environment and file descriptors never
+# leak into the server or into other requests.
+
+# Bytes read with the first message (which carries the passed file descriptors)
+_FIRST_READ = 65536
+# Seconds a client may take to send its request before its child gives up on it
+REQUEST_TIMEOUT = 5
+
+
+def _peer_is_same_user(conn):
+    """Only the user running the server may use it (SO_PEERCRED, Linux)."""
+    peercred = getattr(socket, "SO_PEERCRED", None)
+    if peercred is None:
+        return True # The socket file's 0600 permissions still apply
+    creds = conn.getsockopt(socket.SOL_SOCKET, peercred, 12)
+    uid = int.from_bytes(creds[4:8], sys.byteorder)
+    return uid == os.getuid()
+
+def _receive_request(conn):
+    """Returns (request, fds) from a client, or (None, fds) if it is malformed."""
+    data, fds, _, _ = socket.recv_fds(conn, _FIRST_READ, 3)
+    length, newline, payload = data.partition(b"\n")
+    if not newline or not length.isdigit():
+        return None, fds
+    try:
+        while len(payload) < int(length):
+            chunk = conn.recv(_FIRST_READ)
+            if not chunk:
+                return None, fds
+            payload += chunk
+    except OSError: # Including a stall past REQUEST_TIMEOUT
+        return None, fds
+    try:
+        return client.decode_request(payload), fds
+    except (ValueError, IndexError):
+        return None, fds
+
+def _serve_connection(conn, handle):
+    """
+    Child side: reads the request and runs it. Reading happens here rather than in
+    the accept loop, so a client that sends nothing only holds up its own child.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    conn.settimeout(REQUEST_TIMEOUT)
+    try:
+        request, fds = _receive_request(conn)
+    except OSError: # Nothing received in time, or the client went away
+        os._exit(1)
+    conn.settimeout(None)
+    if request is None or len(fds) != 3:
+        os._exit(1)
+    _run_request(conn, request, fds, handle)
+
+def _run_request(conn, request, fds, handle):
+    """Child side: adopts the client's terminal, cwd and environment and runs the request."""
+    # Become a process group so the client can forward Ctrl-C to everything the request started
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    conn.sendall(f"pid {os.getpid()}\n".encode())
+
+    status = 1
+    try:
+        os.environ.clear()
+        os.environ.update(request.get("env", {}))
+        os.chdir(request.get("cwd", "/"))
+        # Color output depends on the client's terminal and NO_COLOR/TERM
+        cm.rebuild_color_table()
+        status = handle(request.get("args", []))
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 0
+    except KeyboardInterrupt:
+        status = 130
+    except Exception as e:
+        cm.print_colored(f"Uncaught Error: {e}", "error")
+    finally:
+        # os._exit() below skips atexit, which would write pending config changes
+        cm.flush_config()
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except OSError:
+            pass
+    try:
+        conn.sendall(f"exit {status}\n".encode())
+    except OSError:
+        pass # The client went away
+    os._exit(status & 0xFF)
+
+def _reap_children():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+def serve(socket_path, handle):
+    """
+    Listens on 'socket_path' and runs each request with handle(args) -> status
+    in a forked child. Runs until interrupted.
+    """
+    # Replace a stale socket left by a crashed server, but never a live one
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            cm.print_colored(f"aero: a server is already listening on {socket_path}", "error")
+            return 1
+        except OSError:
+            os.unlink(socket_path)
+        finally:
+            probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    # Finished requests are reaped as soon as they exit
+    signal.signal(signal.SIGCHLD, lambda signum, frame: _reap_children())
+
+    cm.print_colored(f"Aero server listening on {socket_path}", "success")
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except InterruptedError:
+                continue
+            with conn:
+                if not _peer_is_same_user(conn):
+                    continue
+                # Requests start with the current config.json, including changes made by earlier ones
+                cm.reload_config()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                if os.fork() == 0:
+                    # Whatever happens, the child never returns into the accept loop
+                    try:
+                        listener.close()
+                        _serve_connection(conn, handle)
+                    finally:
+                        os._exit(1)
+    except KeyboardInterrupt:
+        cm.print_colored("\nAero server stopped.", "warning")
+    finally:
+        listener.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
@@ -0,0 +1,250 @@
+import os
+import sys
+import time
+import _thread
+
+# Startup tracing for 'aero --profile-startup'.
+# This module must stay dependency-free (stdlib 'os', 'sys', 'time' and the built-in
+# '_thread' only): it is imported before the rest of Aero so that it can time every
+# later import.
+
+_enabled = False
+_start_wall = 0.0
+_start_cpu = 0.0
+_total = None
+# Wall time from process start until enable() was called (None if unknown)
+_interpreter_wall = None
+_depth = 0
+
+# Completed phases in the order they finished: {name, category, depth, start, wall, cpu},
+# where 'start' is seconds since enable()
+PHASES = []
+# Module name -> {"cumulative": seconds, "self": seconds}
+IMPORTS = {}
+# Per thread: accumulated child import time for each import currently executing
+# (_thread._local is threading.local without importing 'threading')
+_imports = _thread._local()
+
+
+# --- Phases ---
+
+class _Phase:
+    """Context manager that records wall and CPU time for one startup phase."""
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        global _depth
+        self.depth = _depth
+        _depth += 1
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _depth
+        _depth -= 1
+        PHASES.append({
+            "name": self.name,
+            "category": self.category,
+            "depth": self.depth,
+            "start": self.wall - _start_wall,
+            "wall": time.perf_counter() - self.wall,
+            "cpu": time.process_time() - self.cpu,
+        })
+        return False
+
+
+class _NullPhase:
+    """No-op phase used when profiling is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name, category="phase"):
+    """Returns a context manager timing 'name' (a no-op unless profiling is enabled)."""
+    if not _enabled:
+        return _NULL_PHASE
+    return _Phase(name, category)
+
+
+# --- Import Timing ---
+
+def _import_stack():
+    stack = getattr(_imports, "stack", None)
+    if stack is None:
+        stack = _imports.stack = []
+    return stack
+
+class _TimedLoader:
+    """Wraps a module loader and records how long exec_module takes."""
+
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        import_stack = _import_stack()
+        import_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = import_stack.pop()
+            if import_stack:
+                import_stack[-1] += elapsed
+            IMPORTS[self._name] = {"cumulative": elapsed, "self": elapsed - children}
+
+
+class _ImportTimer:
+    """Meta path finder that delegates to the other finders and wraps their loaders."""
+
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is cls:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, name)
+            return spec
+        return None
+
+
+# --- Control ---
+
+def enabled():
+    """Returns True while startup profiling is active."""
+    return _enabled
+
+def _process_age():
+    """
+    Returns the wall time in seconds since this process started, or None where the
+    start time is unavailable (it is read from /proc, so Linux only). The start time
+    has clock-tick resolution (usually 10 ms).
+    """
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        # starttime is field 22; fields are counted after the ')' ending the command name
+        start_ticks = int(stat.rpartition(b")")[2].split()[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def enable(time_imports=True):
+    """
+    Starts the profiling clock and, with 'time_imports', begins timing imports
+    (a budget check alone skips the import hook and its overhead).
+    """
+    global _enabled, _start_wall, _start_cpu, _interpreter_wall
+    _enabled = True
+    _start_wall = time.perf_counter()
+    _start_cpu = time.process_time()
+    _interpreter_wall = _process_age()
+    if time_imports and _ImportTimer not in sys.meta_path:
+        sys.meta_path.insert(0, _ImportTimer)
+
+def stop():
+    """Stops profiling and freezes the total startup time."""
+    global _enabled, _total
+    if _ImportTimer in sys.meta_path:
+        sys.meta_path.remove(_ImportTimer)
+    if _enabled:
+        _total = {
+            "interpreter": _interpreter_wall,
+            "wall": time.perf_counter() - _start_wall,
+            "cpu": time.process_time() - _start_cpu,
+        }
+    _enabled = False
+
+
+# --- Reporting ---
+
+def report():
+    """Returns the collected timings as a JSON-serialisable dictionary."""
+    imports = [
+        {"module": name, "cumulative": t["cumulative"], "self": t["self"]}
+        for name, t in IMPORTS.items()
+    ]
+    imports.sort(key=lambda item: item["self"], reverse=True)
+    return {
+        "total": _total,
+        # In start order, so that 'depth' nests each phase under its parent
+        "phases": sorted((p for p in PHASES if p["category"] == "phase"), key=lambda p: p["start"]),
+        "plugins": sorted((p for p in PHASES if p["category"] == "plugin"),
+                          key=lambda p: p["wall"], reverse=True),
+        "imports": imports,
+    }
+
+def write_json(path):
+    """Writes the report to 'path' as JSON."""
+    import json
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2)
+
+def print_report(limit=15):
+    """Prints a human-readable report: phases as a tree in start order, other items slowest first."""
+    data = report()
+
+    def ms(seconds):
+        return f"{seconds * 1000:9.2f} ms"
+
+    if data["total"]:
+        if data["total"]["interpreter"] is not None:
+            print(f"Interpreter boot: wall {ms(data['total']['interpreter'])}")
+        print(f"Startup total: wall {ms(data['total']['wall'])}  cpu {ms(data['total']['cpu'])}")
+
+    print("\nPhases (wall / cpu):")
+    for p in data["phases"]:
+        print(f"  {ms(p['wall'])}  {ms(p['cpu'])}  {'  ' * p['depth']}{p['name']}")
+
+    print("\nPlugins (wall / cpu):")
+    if not data["plugins"]:
+        print("  (none)")
+    for p in data["plugins"]:
+        print(f"  {ms(p['wall'])}  {ms(p['cpu'])}  {p['name']}")
+
+    print(f"\nSlowest imports (self / cumulative, top {limit} of {len(data['imports'])}):")
+    for item in data["imports"][:limit]:
+        print(f"  {ms(item['self'])}  {ms(item['cumulative'])}  {item['module']}")
+
+def time_to_prompt():
+    """
+    Returns the wall time in seconds from process start to the first prompt (None
+    before stop()). Where the process start time is unknown, interpreter boot is
+    left out and only Aero's own startup is counted.
+    """
+    if not _total:
+        return None
+    return (_total["interpreter"] or 0.0) + _total["wall"]
+
+def check_budget(budget_ms):
+    """
+    Compares process-start-to-first-prompt wall time against a budget.
+
+    Returns:
+        tuple: (elapsed_ms, within_budget)
+    """
+    elapsed_ms = (time_to_prompt() or 0.0) * 1000
+    return elapsed_ms, elapsed_ms <= budget_ms
@@ -9,6 +9,14 @@ import ssl
 
 # Import core library functions for printing and coloring
 import config_manager as cm
+try:
+    import completion
+except ImportError:
+    completion = None # Older Aero without tab completion
+try:
+    import http_client
+except ImportError:
+    http_client = None # Older Aero without the pooled HTTP client
 
 # Gemini API configuration
 DEFAULT_MODEL = "gemma-3n-e4b-it"
@@ -74,22 +82,27 @@ def send_to_gemini(message, model, api_key):
         "contents": [{"parts": [{"text": message}]}],
     }
     
-    # Bypass SSL for network calls (standard practice in many embedded shells)
-    context = ssl._create_unverified_context()
-    
     try:
         data = json.dumps(payload).encode('utf-8')
-        req = urllib.request.Request(API_URL, data=data, headers=headers)
-        
-        with urllib.request.urlopen(req, context=context, timeout=30) as response:
-            result = json.loads(response.read().decode())
-            
-            # Extract the text content
-            if result.get('candidates') and result['candidates'][0].get('content'):
-                return result['candidates'][0]['content']['parts'][0]['text']
-            else:
-                return "API returned no text content."
-                
+        if http_client:
+            # Keeps the connection open between prompts (a POST is never retried)
+            response = http_client.request("POST", API_URL, headers=headers, body=data, timeout=30)
+            if response.status >= 400:
+                return f"HTTP Error: {response.status} - API Key or Model may be invalid."
+            result = response.json()
+        else:
+            # Bypass SSL for network calls (standard practice in many embedded shells)
+            context = ssl._create_unverified_context()
+            req = urllib.request.Request(API_URL, data=data, headers=headers)
+            with urllib.request.urlopen(req, context=context, timeout=30) as response:
+                result = json.loads(response.read().decode())
+
+        # Extract the text content
+        if result.get('candidates') and result['candidates'][0].get('content'):
+            return result['candidates'][0]['content']['parts'][0]['text']
+        else:
+            return "API returned no text content."
+
     except urllib.error.HTTPError as e:
         return f"HTTP Error: {e.code} - API Key or Model may be invalid."
     except Exception as e:
@@ -208,3 +221,6 @@ def register_plugin_commands(COMMANDS):
     COMMANDS["ai setkey"] = setkey_cmd
     COMMANDS["ai setmodel"] = setmodel_cmd
     COMMANDS["ai help"] = help_cmd
+    if completion:
+        completion.register_completion("ai setkey", subcommands=["env"])
+        completion.register_completion("ai setmodel", completer=lambda text, args: [] if args else AVAILABLE_MODELS)
@@ -7,6 +7,18 @@ from collections import defaultdict
 # Import core library functions
 import config_manager as cm
 from constants import REPO_ROOT_URL, AERO_DIR
+try:
+    import completion
+except ImportError:
+    completion = None # Older Aero without tab completion
+try:
+    import http_cache
+except ImportError:
+    http_cache = None # Older Aero without the HTTP cache
+try:
+    import http_client
+except ImportError:
+    http_client = None # Older Aero without the pooled HTTP client
 
 # --- Plugin Metadata ---
 __PLUGIN_NAME__ = "theme"
@@ -41,13 +53,15 @@ def _get_remote_themes():
         # Construct the API URL to list the contents of the themes directory
         api_url = f"https://api.github.com/repos/nebuff/aero/contents/themes"
         
-        # Create an unverified SSL context for simplicity
-        context = ssl._create_unverified_context()
-        
-        with urllib.request.urlopen(api_url, context=context, timeout=5) as resp:
-            data = resp.read().decode()
+        if http_cache:
+            # Cached on disk and revalidated with ETags
+            files = http_cache.fetch_json(api_url)
+        else:
+            # Create an unverified SSL context for simplicity
+            context = ssl._create_unverified_context()
             
-        files = json.loads(data)
+            with urllib.request.urlopen(api_url, context=context, timeout=5) as resp:
+                files = json.loads(resp.read().decode())
         remote_themes = set()
         for f in files:
             name = f.get("name", "")
@@ -138,12 +152,9 @@ def cmd_theme_set(args):
     # Set the active theme marker
     new_config['active_theme'] = theme_name
     
-    # Save the merged configuration
+    # Save the merged configuration (the new prompt and colors apply immediately)
     cm.save_config(new_config)
     
-    # Reload config manager to update prompt/color functions immediately
-    cm.load_config() 
-    
     cm.print_colored(f"Theme '{theme_name}' applied successfully. Config and colors updated.", "success")
 
 
@@ -161,17 +172,21 @@ def cmd_theme_download(args):
     os.makedirs(THEMES_DIR, exist_ok=True)
     
     try:
-        context = ssl._create_unverified_context()
         cm.print_colored(f"Downloading theme '{theme_name}' from {url} ...", "info")
-        
-        # Check if remote file exists (by checking response status)
-        with urllib.request.urlopen(url, context=context, timeout=5) as response:
-            if response.getcode() != 200:
-                raise Exception(f"Theme not found (HTTP {response.getcode()})")
-            
-            # Write content to local file
-            with open(dest, "wb") as out_file:
-                out_file.write(response.read())
+
+        if http_client:
+            # Raises HTTPError (e.g. 404) if the theme does not exist
+            http_client.download(url, dest, timeout=5)
+        else:
+            context = ssl._create_unverified_context()
+            # Check if remote file exists (by checking response status)
+            with urllib.request.urlopen(url, context=context, timeout=5) as response:
+                if response.getcode() != 200:
+                    raise Exception(f"Theme not found (HTTP {response.getcode()})")
+
+                # Write content to local file
+                with open(dest, "wb") as out_file:
+                    out_file.write(response.read())
 
         cm.print_colored(f"Installed theme '{theme_name}' to {dest}. Use 'theme set {theme_name}' to apply.", "success")
     except Exception as e:
@@ -256,3 +271,6 @@ def cmd_theme(args):
 def register_plugin_commands(COMMANDS):
     """Registers the 'theme' command."""
     COMMANDS['theme'] = cmd_theme
+    if completion:
+        completion.register_completion("theme", subcommands=["list", "set", "download", "create", "help"])
+        completion.register_completion("theme set", completer=lambda text, args: [] if args else list(_get_local_themes()))
@@ -3,6 +3,9 @@ __PLUGIN_VERSION__ = "1.4.0"
 import os
 import ssl
 import sys
+import time
+import hashlib
+import concurrent.futures
 import urllib.request
 import json
 import shutil
@@ -11,6 +14,18 @@ import subprocess
 # Import core library functions
 import config_manager as cm
 from constants import AERO_DIR, PLUGINS_DIR, __AERO_VERSION__
+try:
+    import completion
+except ImportError:
+    completion = None # Older Aero without tab completion
+try:
+    import http_cache
+except ImportError:
+    http_cache = None # Older Aero without the HTTP cache
+try:
+    import http_client
+except ImportError:
+    http_client = None # Older Aero without the pooled HTTP client
 # Note: REPO_ROOT_URL is needed for full update logic, assume it's imported in constants
 # For now, hardcode API URLs as they were in the original snippet, but should ideally use constants
 
@@ -18,29 +33,57 @@ VERSIONS_API = "https://api.github.com/repos/nebuff/aero/contents/versions"
 RAW_BASE_URL = "https://raw.githubusercontent.com/nebuff/aero/main/versions"
 PLUGINS_API = "https://api.github.com/repos/nebuff/aero/contents/plugins"
 PLUGINS_RAW_URL = "https://raw.githubusercontent.com/nebuff/aero/main/plugins"
+# Plugins downloaded at once by 'update plugins'
+MAX_PARALLEL_DOWNLOADS = 8
 
 # --- Utility Functions ---
 
+def _fetch_listing(api_url, fresh=False):
+    """
+    Returns a GitHub contents API listing, from the HTTP cache when available.
+    With 'fresh', a cached copy is always revalidated first (a cheap 304 if unchanged).
+    """
+    if http_cache:
+        # Cached on disk and revalidated with ETags
+        return http_cache.fetch_json(api_url, ttl=0 if fresh else http_cache.DEFAULT_TTL)
+    context = ssl._create_unverified_context()
+    with urllib.request.urlopen(api_url, context=context) as response:
+        return json.loads(response.read().decode())
+
+def _download(url, dest):
+    """Saves a file from the repository, on a pooled connection when available."""
+    if http_client:
+        http_client.download(url, dest)
+        return
+    context = ssl._create_unverified_context()
+    with urllib.request.urlopen(url, context=context) as response, open(dest, "wb") as out_file:
+        out_file.write(response.read())
+
+def _git_blob_sha(path):
+    """Returns a file's git blob SHA-1 (the contents API 'sha'), or None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
 def list_versions():
     """Lists available Aero versions from the GitHub API."""
-    context = ssl._create_unverified_context()
     try:
-        with urllib.request.urlopen(VERSIONS_API, context=context) as response:
-            data = json.loads(response.read().decode())
-            versions = [item['name'] for item in data if item['type'] == 'file' and item['name'].endswith('.sh')]
-            # Remove '.sh' extension for display
-            return [v[:-3] for v in versions]
+        data = _fetch_listing(VERSIONS_API)
+        versions = [item['name'] for item in data if item['type'] == 'file' and item['name'].endswith('.sh')]
+        # Remove '.sh' extension for display
+        return [v[:-3] for v in versions]
     except Exception as e:
         cm.print_colored(f"Error listing versions: {e}", "error")
         return []
 
 def list_remote_plugins():
     """Lists all plugin files available in the remote repository."""
-    context = ssl._create_unverified_context()
     try:
-        with urllib.request.urlopen(PLUGINS_API, context=context) as response:
-            data = json.loads(response.read().decode())
-            return [item['name'] for item in data if item['type'] == 'file' and item['name'].endswith('.py')]
+        data = _fetch_listing(PLUGINS_API)
+        return [item['name'] for item in data if item['type'] == 'file' and item['name'].endswith('.py')]
     except Exception as e:
         cm.print_colored(f"Error listing remote plugins: {e}", "error")
         return []
@@ -58,8 +101,7 @@ def update_aero_core(version):
     
     cm.print_colored(f"Fetching installer from {raw_url}", "info")
     try:
-        context = ssl._create_unverified_context()
-        urllib.request.urlretrieve(raw_url, temp_installer_path, context=context)
+        _download(raw_url, temp_installer_path)
         os.chmod(temp_installer_path, 0o755)
     except Exception as e:
         cm.print_colored(f"Failed to download installer: {e}", "error")
@@ -95,26 +137,66 @@ def update_plugin(plugin_name):
     cm.print_colored(f"Updating plugin '{plugin_name}'...", "info")
     
     try:
-        context = ssl._create_unverified_context()
-        urllib.request.urlretrieve(raw_url, local_path, context=context)
+        _download(raw_url, local_path)
         cm.print_colored(f"Plugin '{plugin_name}' updated successfully!", "success")
     except Exception as e:
         cm.print_colored(f"Failed to update plugin '{plugin_name}': {e}", "error")
 
 
 def update_all_plugins():
-    """Download and update all plugins from GitHub"""
+    """
+    Download and update all plugins from GitHub. Only plugins whose git blob SHA
+    differs from the 'sha' in the contents API listing are downloaded, in parallel.
+    """
     cm.print_colored("Updating all Aero plugins...", "data_primary")
-    plugins = list_remote_plugins()
-    if not plugins:
+    start = time.perf_counter()
+    try:
+        data = _fetch_listing(PLUGINS_API, fresh=True)
+    except Exception as e:
+        cm.print_colored(f"Error listing remote plugins: {e}", "error")
+        return
+    remote = [item for item in data if item['type'] == 'file' and item['name'].endswith('.py')]
+    if not remote:
         cm.print_colored("No plugins found in the remote repository.", "error")
         return
 
-    for plugin_file in plugins:
-        plugin_name = plugin_file[:-3]  # strip .py
-        update_plugin(plugin_name)
-        
-    cm.print_colored("All plugins updated! Restart Aero or run 'refresh' to reload them.", "success")
+    # (item, action) for each plugin that is missing or differs locally
+    changed = []
+    for item in remote:
+        local_sha = _git_blob_sha(os.path.join(PLUGINS_DIR, item['name']))
+        if local_sha != item.get('sha'):
+            changed.append((item, "Updated" if local_sha else "Added"))
+
+    failed = 0
+    if changed:
+        os.makedirs(PLUGINS_DIR, exist_ok=True)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_DOWNLOADS, len(changed))) as pool:
+            futures = {
+                pool.submit(
+                    _download,
+                    item.get('download_url') or f"{PLUGINS_RAW_URL}/{item['name']}",
+                    os.path.join(PLUGINS_DIR, item['name']),
+                ): (item['name'][:-3], action)
+                for item, action in changed
+            }
+            # Report each plugin as soon as its download finishes
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                plugin_name, action = futures[future]
+                progress = f"[{done}/{len(changed)}]"
+                try:
+                    future.result()
+                    cm.print_colored(f"  {progress} {action} '{plugin_name}'", "success")
+                except Exception as e:
+                    failed += 1
+                    cm.print_colored(f"  {progress} Failed to update '{plugin_name}': {e}", "error")
+
+    summary = f"{len(changed) - failed} updated, {len(remote) - len(changed)} unchanged"
+    if failed:
+        summary += f", {failed} failed"
+    elapsed = time.perf_counter() - start
+    cm.print_colored(f"Plugins: {summary} ({elapsed:.2f} s).", "error" if failed else "success")
+    if len(changed) > failed:
+        cm.print_colored("Restart Aero or run 'refresh' to reload them.", "info")
 
 
 # ---------- Main Update Command ----------
@@ -173,7 +255,7 @@ def print_help():
         "update": "List available versions and update interactively.",
         "update <version>": "Install a specific core version (e.g. aero-beta-2.1.3).",
         "update check": "Show available versions only.",
-        "update plugins": "Update all installed plugins.",
+        "update plugins": "Update all plugins (only changed files are downloaded).",
         "update plugin <name>": "Update a specific plugin (e.g. update plugin color).",
     }
     
@@ -183,3 +265,8 @@ def print_help():
 def register_plugin_commands(COMMANDS):
     """Registers the 'update' command."""
     COMMANDS["update"] = update_cmd
+    if completion:
+        completion.register_completion("update", subcommands=["check", "plugins", "plugin", "help"])
+        completion.register_completion("update plugin", completer=lambda text, args: [] if args else [
+            f[:-3] for f in os.listdir(PLUGINS_DIR) if f.endswith(".py")
+        ])
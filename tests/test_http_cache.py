@@ -0,0 +1,129 @@
+"""
+Checks lib/http_cache.py against a local http.server: a first fetch (200), ETag
+and Last-Modified revalidation (304), TTL hits, and serving the cached copy when
+the server fails or is gone.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+import http.server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aero", "lib"))
+import http_cache
+import http_client
+
+BODY = b'[{"name": "theme.py"}]'
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class CatalogHandler(http.server.BaseHTTPRequestHandler):
+    """Serves BODY with validators; the test sets 'fail_with' to simulate an outage."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+    fail_with = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        CatalogHandler.requests.append({
+            "if_none_match": self.headers.get("If-None-Match"),
+            "if_modified_since": self.headers.get("If-Modified-Since"),
+        })
+        if CatalogHandler.fail_with:
+            self._reply(CatalogHandler.fail_with)
+        elif self.headers.get("If-None-Match") == ETAG:
+            self._reply(304)
+        else:
+            self._reply(200, BODY)
+
+    def _reply(self, status, body=b""):
+        self.send_response(status)
+        if status in (200, 304):
+            self.send_header("ETag", ETAG)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class HTTPCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self._cache_dir = http_cache.HTTP_CACHE_DIR
+        http_cache.HTTP_CACHE_DIR = self.cache_dir
+        # Outages are served from the cache straight away, without retry delays
+        self._retries = http_client.DEFAULT_RETRIES
+        http_client.DEFAULT_RETRIES = 0
+        CatalogHandler.requests = []
+        CatalogHandler.fail_with = None
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/contents/plugins"
+
+    def tearDown(self):
+        self._stop_server()
+        http_client.close_all()
+        http_cache.HTTP_CACHE_DIR = self._cache_dir
+        http_client.DEFAULT_RETRIES = self._retries
+        shutil.rmtree(self.cache_dir)
+
+    def _stop_server(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def test_first_fetch_is_stored(self):
+        self.assertEqual(http_cache.fetch(self.url), BODY)
+        self.assertEqual(CatalogHandler.requests, [{"if_none_match": None, "if_modified_since": None}])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2) # <key>.body and <key>.json
+
+    def test_fresh_copy_skips_the_server(self):
+        http_cache.fetch(self.url)
+        self.assertEqual(http_cache.fetch(self.url, ttl=600), BODY)
+        self.assertEqual(len(CatalogHandler.requests), 1)
+
+    def test_expired_copy_is_revalidated(self):
+        http_cache.fetch(self.url)
+        self.assertEqual(http_cache.fetch(self.url, ttl=0), BODY)
+        self.assertEqual(CatalogHandler.requests[1], {"if_none_match": ETAG, "if_modified_since": LAST_MODIFIED})
+
+    def test_revalidation_refreshes_the_ttl(self):
+        http_cache.fetch(self.url)
+        http_cache.fetch(self.url, ttl=0) # 304
+        http_cache.fetch(self.url, ttl=600)
+        self.assertEqual(len(CatalogHandler.requests), 2)
+
+    def test_stale_copy_on_server_error(self):
+        http_cache.fetch(self.url)
+        CatalogHandler.fail_with = 503
+        self.assertEqual(http_cache.fetch(self.url, ttl=0), BODY)
+
+    def test_stale_copy_when_offline(self):
+        http_cache.fetch(self.url)
+        self._stop_server()
+        self.assertEqual(http_cache.fetch(self.url, ttl=0), BODY)
+
+    def test_not_found_is_a_miss(self):
+        http_cache.fetch(self.url)
+        CatalogHandler.fail_with = 404
+        with self.assertRaises(http_cache.CacheMiss):
+            http_cache.fetch(self.url, ttl=0)
+
+    def test_miss_without_a_cached_copy(self):
+        self._stop_server()
+        with self.assertRaises(http_cache.CacheMiss):
+            http_cache.fetch(self.url)
+
+
+if __name__ == "__main__":
+    unittest.main()
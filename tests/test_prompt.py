@@ -0,0 +1,110 @@
+"""
+Checks compiled prompt templates (config_manager.compile_prompt/format_prompt)
+against what format_prompt() did before templates were compiled: replace the
+color tags, then str.format() the result with every placeholder's value. Also
+checks that only the placeholders a template references are evaluated.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aero", "lib"))
+import config_manager as cm
+
+PLACEHOLDERS = {
+    "user": "aero",
+    "host": "box",
+    "pi": 3.14159,
+    "count": 7,
+    "width": 10,
+    "fmt": ".3f",
+    "snowman": "snow☃",
+    "items": ["first", "second"],
+}
+# No 'blue': tags of unknown colors are left as they are
+COLORS = {"reset": "\033[0m", "green": "\033[32m", "bold": "\033[1m"}
+
+TEMPLATES = [
+    "<green>{user}</green>@<blue>{host}</blue> ❯ ",
+    "{{literal}} {user} }}{{",
+    "{user:>10}|{user:<6}|{pi:.2f}|{count:04d}",
+    "{user!r} {user!s} {snowman!a} {count!r:>4}",
+    "{user:^{width}}|{pi:{fmt}}",
+    "{items[0]} {items[1]} {user.__class__.__name__}",
+    "<bold>{user}</bold></nosuchtag> {user}{user}",
+    "no placeholders at all",
+    "",
+]
+
+
+def reference_format(template):
+    """format_prompt() before compilation: tag replacement, then str.format()."""
+    for color_name in cm.COLOR_MAP:
+        prefix, suffix = cm.COLOR_TABLE.get(color_name, ("", ""))
+        template = template.replace(f"<{color_name}>", prefix).replace(f"</{color_name}>", suffix)
+    return template.format(**{name: provider.get() for name, provider in cm.PROMPT_PLACEHOLDERS.items()})
+
+
+class PromptTest(unittest.TestCase):
+
+    def setUp(self):
+        self._placeholders = dict(cm.PROMPT_PLACEHOLDERS)
+        self._color_map = cm.COLOR_MAP
+        self._color_table = cm.COLOR_TABLE
+        self.calls = {}
+        for name, value in PLACEHOLDERS.items():
+            cm.register_prompt_provider(name, self._counting(name, value))
+        # Render color tags whether or not the tests run on a terminal
+        cm.COLOR_MAP = dict(COLORS)
+        cm.COLOR_TABLE = {key: (code, COLORS["reset"]) for key, code in COLORS.items()}
+        cm.invalidate_prompt_cache()
+
+    def tearDown(self):
+        cm.PROMPT_PLACEHOLDERS.clear()
+        cm.PROMPT_PLACEHOLDERS.update(self._placeholders)
+        cm.COLOR_MAP = self._color_map
+        cm.COLOR_TABLE = self._color_table
+        cm.invalidate_prompt_cache()
+
+    def _counting(self, name, value):
+        def provide():
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return value
+        return provide
+
+    def test_matches_str_format(self):
+        for template in TEMPLATES:
+            with self.subTest(template=template):
+                self.assertEqual(cm.format_prompt(template), reference_format(template))
+
+    def test_compiled_template_is_reused(self):
+        self.assertIs(cm.compile_prompt(TEMPLATES[0]), cm.compile_prompt(TEMPLATES[0]))
+        self.assertEqual(cm.format_prompt(TEMPLATES[0]), cm.format_prompt(TEMPLATES[0]))
+
+    def test_escaped_braces(self):
+        self.assertEqual(cm.format_prompt("{{user}} {{{user}}}"), "{user} {aero}")
+
+    def test_color_tags(self):
+        self.assertEqual(cm.format_prompt("<green>{user}</green> <blue>"), "\033[32maero\033[0m <blue>")
+
+    def test_unknown_placeholder(self):
+        with self.assertRaises(KeyError):
+            cm.format_prompt("{user} {nosuchplaceholder}")
+
+    def test_malformed_templates(self):
+        for template in ("{user", "user}", "{user!x}"):
+            with self.subTest(template=template):
+                with self.assertRaises(ValueError):
+                    reference_format(template)
+                with self.assertRaises(ValueError):
+                    cm.format_prompt(template)
+
+    def test_only_referenced_placeholders_are_evaluated(self):
+        cm.format_prompt("{user}{user:>8} {pi:{fmt}}")
+        self.assertEqual(self.calls, {"user": 1, "pi": 1, "fmt": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Checks 'aero --startup-budget=MS': runs the shell in a subprocess from a copy of
+the aero/ tree in a temp directory (so config.json, the plugin manifest and
+history are fresh and the checkout is left alone) and asserts its exit status.
+
+STARTUP_BUDGET_MS is the budget a normal startup must meet; set the
+AERO_STARTUP_BUDGET_MS environment variable to tighten or loosen it for a
+given machine.
+
+Run with:  python -m unittest discover tests   (or: python -m pytest tests)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+AERO_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "aero")
+STARTUP_BUDGET_MS = float(os.environ.get("AERO_STARTUP_BUDGET_MS", 2000))
+SLOW_PLUGIN = '''
+import time
+time.sleep(1.0)
+
+def register_plugin_commands(COMMANDS):
+    COMMANDS["slow"] = lambda args: 0
+'''
+
+
+class StartupBudgetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.aero_dir = os.path.join(tempfile.mkdtemp(), "aero")
+        os.makedirs(self.aero_dir)
+        shutil.copy(os.path.join(AERO_SOURCE, "aero"), self.aero_dir)
+        ignore = shutil.ignore_patterns("__pycache__")
+        for name in ("lib", "plugins", "themes"):
+            shutil.copytree(os.path.join(AERO_SOURCE, name), os.path.join(self.aero_dir, name), ignore=ignore)
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.aero_dir))
+
+    def _start(self, budget):
+        """Starts aero up to its first prompt with a budget; returns the CompletedProcess."""
+        return subprocess.run(
+            [sys.executable, os.path.join(self.aero_dir, "aero"), f"--startup-budget={budget}"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            cwd=self.aero_dir, timeout=60, text=True,
+        )
+
+    def test_startup_is_within_budget(self):
+        # The first start imports every plugin and writes the manifest...
+        result = self._start(STARTUP_BUDGET_MS)
+        self.assertEqual(result.returncode, 0, result.stdout)
+        # ...later ones register them from it
+        result = self._start(STARTUP_BUDGET_MS)
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_exceeded_budget_fails(self):
+        result = self._start(0)
+        self.assertEqual(result.returncode, 1, result.stdout)
+        self.assertIn("over the 0.0 ms budget", result.stdout)
+
+    def test_slow_plugin_exceeds_budget(self):
+        with open(os.path.join(self.aero_dir, "plugins", "slow.py"), "w") as f:
+            f.write(SLOW_PLUGIN)
+        result = self._start(500)
+        self.assertEqual(result.returncode, 1, result.stdout)
+
+    def test_invalid_budget_is_a_usage_error(self):
+        result = self._start("fast")
+        self.assertEqual(result.returncode, 2, result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()